@@ -0,0 +1,137 @@
+"""Cold start of the MCP servers: time to the first tools/list and peak RSS.
+
+Each server is spawned over stdio the way an MCP client does it, sent
+initialize, notifications/initialized and tools/list, and timed until the
+tools/list response arrives. Peak RSS (VmHWM, Linux only) is read a few
+seconds later, after any warm-up has had time to run. Three modes:
+
+  eager   the heavy dependency is imported before the server starts (the
+          cost every session paid when it was imported at module load)
+  lazy    as shipped: imported by the first tool call that needs it
+  warmup  lazy, plus MCP_WARMUP=1 (background import after the handshake)
+
+The research server normally runs over streamable HTTP; it is measured over
+stdio (MCP_TRANSPORT=stdio) so all three are compared the same way. All
+state goes to a temporary directory.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--servers video,scholar,research]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MCPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# name -> (script, heavy module the server defers)
+SERVERS = {
+    'video': (os.path.join(MCPS_DIR, 'video-downloader', 'server.py'), 'yt_dlp'),
+    'scholar': (os.path.join(MCPS_DIR, 'scholar-assistant', 'server.py'), 'scholarly'),
+    'research': (os.path.join(MCPS_DIR, 'research-server-streamable', 'python', 'research-server-streamable.py'),
+                 'arxiv'),
+}
+
+MODES = ('eager', 'lazy', 'warmup')
+
+# Runs a server script as __main__ like `python server.py`, optionally after
+# importing its heavy dependency to reproduce the old eager startup
+RUNNER = """
+import os, runpy, sys
+script, preload = sys.argv[1], sys.argv[2]
+if preload:
+    __import__(preload)
+sys.path.insert(0, os.path.dirname(script))
+sys.argv = [script]
+runpy.run_path(script, run_name='__main__')
+"""
+
+
+def send(proc, message):
+    proc.stdin.write((json.dumps(message) + '\n').encode('utf-8'))
+    proc.stdin.flush()
+
+
+def receive(proc, request_id):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError('server exited before answering')
+        try:
+            message = json.loads(line)
+        except ValueError:
+            continue
+        if message.get('id') == request_id:
+            return message
+
+
+def peak_rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def measure(name, mode, workdir, settle):
+    script, heavy = SERVERS[name]
+    env = dict(os.environ,
+               MCP_TRANSPORT='stdio',
+               MCP_WARMUP='1' if mode == 'warmup' else '0',
+               SCHOLAR_CACHE_DB=os.path.join(workdir, 'scholar_cache.db'),
+               YTDLP_INFO_CACHE_DIR=os.path.join(workdir, 'info'),
+               VIDEO_STATE_DIR=workdir,
+               FASTMCP_SHOW_CLI_BANNER='false')
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', RUNNER, script, heavy if mode == 'eager' else ''],
+                            cwd=workdir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    try:
+        send(proc, {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {
+            'protocolVersion': '2024-11-05', 'capabilities': {},
+            'clientInfo': {'name': 'bench_startup', 'version': '1.0'}}})
+        receive(proc, 1)
+        send(proc, {'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+        send(proc, {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/list'})
+        tools = receive(proc, 2)['result']['tools']
+        elapsed = time.perf_counter() - started
+        time.sleep(settle)
+        rss = peak_rss_mb(proc.pid)
+    finally:
+        proc.kill()
+        proc.wait()
+    return elapsed, rss, len(tools)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--servers', default=','.join(SERVERS))
+    parser.add_argument('--settle', type=float, default=3.0,
+                        help='seconds to wait after tools/list before reading peak RSS')
+    args = parser.parse_args()
+
+    print(f'median of {args.runs} runs; peak RSS read {args.settle:g}s after tools/list')
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.servers.split(','):
+            # Modes take turns within each run so machine noise hits all of them alike
+            results = {mode: [] for mode in MODES}
+            for _ in range(args.runs):
+                for mode in MODES:
+                    results[mode].append(measure(name, mode, workdir, args.settle))
+            for mode, samples in results.items():
+                seconds = statistics.median(s[0] for s in samples)
+                rss = [s[1] for s in samples if s[1] is not None]
+                rss_text = f'{statistics.median(rss):7.1f} MB' if rss else '    n/a'
+                print(f'  {name:<9} {mode:<7} tools/list {seconds * 1000:7.1f} ms   '
+                      f'peak RSS {rss_text}   ({samples[0][2]} tools)')
+
+
+if __name__ == '__main__':
+    main()
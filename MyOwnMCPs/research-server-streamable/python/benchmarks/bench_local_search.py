@@ -0,0 +1,70 @@
+"""Query latency of search_local_papers' BM25 index over a large synthetic corpus.
+
+Usage: python benchmarks/bench_local_search.py [--papers 100000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from paper_store import PaperStore
+
+VOCABULARY = [
+    'neural', 'network', 'graph', 'transformer', 'attention', 'learning', 'reinforcement', 'policy',
+    'quantum', 'circuit', 'protein', 'folding', 'diffusion', 'model', 'language', 'vision', 'robot',
+    'control', 'optimization', 'convex', 'bayesian', 'inference', 'causal', 'federated', 'privacy',
+    'adversarial', 'robustness', 'molecule', 'generation', 'retrieval', 'benchmark', 'dataset',
+] + [f'term{i}' for i in range(5000)]
+
+
+def synthetic_paper(rng, i):
+    words = lambda n: ' '.join(rng.choice(VOCABULARY) for _ in range(n))
+    return {
+        'title': words(8).capitalize(),
+        'authors': [f'Author{rng.randrange(20000)}' for _ in range(3)],
+        'summary': words(120),
+        'pdf_url': f'http://arxiv.org/pdf/{i:07d}v1',
+        'published': '2024-01-01',
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--papers', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=50, help='papers per search_papers-sized insert')
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = PaperStore(os.path.join(workdir, 'papers.db'))
+        insert_times = []
+        for start in range(0, args.papers, args.batch):
+            batch = {f'{i:07d}v1': synthetic_paper(rng, i) for i in range(start, min(start + args.batch, args.papers))}
+            t0 = time.perf_counter()
+            store.add_papers(f'topic_{start // 1000}', batch)
+            insert_times.append(time.perf_counter() - t0)
+
+        queries = [' '.join(rng.choice(VOCABULARY[:32]) for _ in range(rng.randint(1, 4))) for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            t0 = time.perf_counter()
+            store.search(query, limit=10)
+            latencies.append(time.perf_counter() - t0)
+
+    print(f'{args.papers} papers indexed incrementally in batches of {args.batch}')
+    print(f'  insert batch  p50 {percentile(insert_times, 50) * 1000:7.2f} ms  p99 {percentile(insert_times, 99) * 1000:7.2f} ms')
+    print(f'  query (top10) p50 {percentile(latencies, 50) * 1000:7.2f} ms  p99 {percentile(latencies, 99) * 1000:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
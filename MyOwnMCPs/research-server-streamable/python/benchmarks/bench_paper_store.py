@@ -0,0 +1,85 @@
+"""Compare extract_info over per-topic papers_info.json files with the SQLite paper store.
+
+Usage: python benchmarks/bench_paper_store.py [--papers 100000] [--topics 1000] [--lookups 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from paper_store import PaperStore
+
+
+# Previous extract_info body, kept here as the baseline
+def legacy_extract_info(paper_dir, paper_id):
+    for item in os.listdir(paper_dir):
+        item_path = os.path.join(paper_dir, item)
+        if os.path.isdir(item_path):
+            file_path = os.path.join(item_path, "papers_info.json")
+            if os.path.isfile(file_path):
+                try:
+                    with open(file_path, "r") as json_file:
+                        papers_info = json.load(json_file)
+                        if paper_id in papers_info:
+                            return json.dumps(papers_info[paper_id], indent=2)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    continue
+    return None
+
+def synthetic_paper(i):
+    return {
+        'title': f'Synthetic paper {i} on topic modelling',
+        'authors': [f'Author {i % 97}', f'Author {i % 89}'],
+        'summary': 'We study synthetic workloads for benchmarking. ' * 8,
+        'pdf_url': f'http://arxiv.org/pdf/{i:07d}v1',
+        'published': '2024-01-01',
+    }
+
+def build_corpus(paper_dir, papers, topics):
+    per_topic = papers // topics
+    for t in range(topics):
+        path = os.path.join(paper_dir, f'topic_{t}')
+        os.makedirs(path)
+        start = t * per_topic
+        info = {f'{i:07d}v1': synthetic_paper(i) for i in range(start, start + per_topic)}
+        with open(os.path.join(path, "papers_info.json"), "w") as f:
+            json.dump(info, f, indent=2)
+    return per_topic * topics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--papers', type=int, default=100000)
+    parser.add_argument('--topics', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as paper_dir:
+        total = build_corpus(paper_dir, args.papers, args.topics)
+        ids = [f'{random.randrange(total):07d}v1' for _ in range(args.lookups)]
+
+        t0 = time.perf_counter()
+        store = PaperStore(os.path.join(paper_dir, "papers.db"))
+        store.migrate_json_dir(paper_dir)
+        migrate = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for paper_id in ids:
+            assert legacy_extract_info(paper_dir, paper_id)
+        legacy = (time.perf_counter() - t0) / len(ids)
+
+        t0 = time.perf_counter()
+        for paper_id in ids:
+            assert store.get_paper(paper_id)
+        indexed = (time.perf_counter() - t0) / len(ids)
+
+        print(f'{total} papers in {args.topics} topics (migration took {migrate:.1f} s)')
+        print(f'  json scan     {legacy * 1000:10.2f} ms/lookup')
+        print(f'  paper store   {indexed * 1000:10.3f} ms/lookup  ({legacy / indexed:.0f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Fire many parallel search_papers writes against the fake arXiv backend and check nothing is lost.
+
+search_papers runs its blocking part (fetch_and_store) on worker threads, so
+this drives fetch_and_store from a thread pool to exercise concurrent writes.
+
+Usage: python benchmarks/stress_search_papers.py [--calls 200] [--threads 32] [--topics 20]
+"""
+import argparse
+import contextlib
+import io
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, SERVER_DIR)
+
+
+def load_server():
+    path = os.path.join(SERVER_DIR, 'research-server-streamable.py')
+    spec = importlib.util.spec_from_file_location('research_server', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--topics', type=int, default=20)
+    args = parser.parse_args()
+
+    # A small paper pool makes different topics return overlapping papers
+    os.environ['ARXIV_BACKEND'] = 'fake'
+    os.environ.setdefault('FAKE_ARXIV_POOL', '50')
+    os.environ.setdefault('FAKE_ARXIV_LATENCY', '0.01')
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        server = load_server()
+        topics = [f'stress topic {i}' for i in range(args.topics)]
+        jobs = [topics[i % len(topics)] for i in range(args.calls)]
+
+        t0 = time.perf_counter()
+        # search_papers prints one line per call; keep the report readable
+        with ThreadPoolExecutor(args.threads) as pool, contextlib.redirect_stdout(io.StringIO()):
+            results = list(pool.map(lambda topic: (topic, server.fetch_and_store(topic, 5)), jobs))
+        elapsed = time.perf_counter() - t0
+
+        expected = {}
+        for topic, paper_ids in results:
+            expected.setdefault(topic, set()).update(paper_ids)
+        lost = 0
+        for topic, paper_ids in expected.items():
+            stored = set(server.store.topic_papers(topic))
+            lost += len(paper_ids - stored)
+            for paper_id in paper_ids:
+                if server.store.get_paper(paper_id) is None:
+                    lost += 1
+        os.chdir(SERVER_DIR)
+
+    print(f'{args.calls} search_papers calls on {args.threads} threads in {elapsed:.2f} s '
+          f'({args.calls / elapsed:.0f} calls/s)')
+    print(f'  lost or missing records: {lost}')
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == '__main__':
+    main()
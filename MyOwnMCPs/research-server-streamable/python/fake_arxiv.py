@@ -0,0 +1,55 @@
+"""Offline stand-in for the `arxiv` package, used when ARXIV_BACKEND=fake.
+
+Results are deterministic per query. IDs are drawn from a pool of
+FAKE_ARXIV_POOL papers, so related queries overlap. Each search sleeps for
+FAKE_ARXIV_LATENCY seconds to mimic a network round trip.
+"""
+import datetime
+import os
+import time
+import zlib
+from types import SimpleNamespace
+
+POOL_SIZE = int(os.environ.get("FAKE_ARXIV_POOL", 1000000))
+LATENCY = float(os.environ.get("FAKE_ARXIV_LATENCY", 0.0))
+
+
+class SortCriterion:
+    Relevance = "relevance"
+    LastUpdatedDate = "lastUpdatedDate"
+    SubmittedDate = "submittedDate"
+
+
+class Search:
+    def __init__(self, query="", max_results=10, sort_by=SortCriterion.Relevance):
+        self.query = query
+        self.max_results = max_results
+        self.sort_by = sort_by
+
+
+class Result:
+    def __init__(self, number, query):
+        self.number = number
+        self.title = f"Fake paper {number} about {query}"
+        self.authors = [SimpleNamespace(name=f"Author {number % 101}"), SimpleNamespace(name=f"Author {number % 37}")]
+        self.summary = f"A synthetic abstract for paper {number}, returned for the query '{query}'."
+        self.pdf_url = f"http://arxiv.org/pdf/{number:07d}v1"
+        self.published = datetime.datetime(2020 + number % 5, 1 + number % 12, 1)
+
+    def get_short_id(self):
+        return f"{self.number:07d}v1"
+
+
+class Client:
+    def __init__(self, page_size=100, delay_seconds=0.0, num_retries=0, pool_size=None, latency=None):
+        self.pool_size = pool_size or POOL_SIZE
+        self.latency = LATENCY if latency is None else latency
+        self.calls = 0
+
+    def results(self, search):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        start = zlib.crc32(search.query.lower().encode("utf-8")) % self.pool_size
+        for i in range(search.max_results):
+            yield Result((start + i) % self.pool_size, search.query)
@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    pdf_url TEXT,
+    published TEXT
+);
+CREATE TABLE IF NOT EXISTS topic_papers (
+    topic TEXT NOT NULL,
+    paper_id TEXT NOT NULL REFERENCES papers(id),
+    PRIMARY KEY (topic, paper_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Full-text index over title, authors and summary, kept in sync with `papers`
+# by triggers so every insert updates it incrementally
+FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE papers_fts USING fts5(
+        title, authors, summary, content='papers', content_rowid='rowid'
+    )""",
+    """CREATE TRIGGER papers_fts_insert AFTER INSERT ON papers BEGIN
+        INSERT INTO papers_fts (rowid, title, authors, summary)
+        VALUES (new.rowid, new.title, new.authors, new.summary);
+    END""",
+    """CREATE TRIGGER papers_fts_delete AFTER DELETE ON papers BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary)
+        VALUES ('delete', old.rowid, old.title, old.authors, old.summary);
+    END""",
+    """CREATE TRIGGER papers_fts_update AFTER UPDATE ON papers BEGIN
+        INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary)
+        VALUES ('delete', old.rowid, old.title, old.authors, old.summary);
+        INSERT INTO papers_fts (rowid, title, authors, summary)
+        VALUES (new.rowid, new.title, new.authors, new.summary);
+    END""",
+)
+
+# BM25 column weights for (title, authors, summary)
+FTS_WEIGHTS = (3.0, 2.0, 1.0)
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def topic_key(topic):
+    """Normalize a topic the same way the old per-topic folders were named"""
+    return topic.lower().replace(" ", "_")
+
+
+class PaperStore:
+    """SQLite store of papers keyed by arXiv short ID, with a topic -> paper mapping.
+
+    Each thread gets its own connection; WAL mode lets readers run while a
+    search is writing, and writes take the database write lock up front
+    (BEGIN IMMEDIATE) so concurrent searches queue instead of losing updates.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        self._create_fts()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly in _write()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _create_fts(self):
+        with self._write() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'papers_fts'"
+            ).fetchone()
+            if not exists:
+                for statement in FTS_SCHEMA:
+                    conn.execute(statement)
+                # Index papers stored before the full-text index existed
+                conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _row_to_info(row):
+        return {
+            'title': row['title'],
+            'authors': json.loads(row['authors']),
+            'summary': row['summary'],
+            'pdf_url': row['pdf_url'],
+            'published': row['published'],
+        }
+
+    def add_papers(self, topic, papers_info):
+        """Store papers ({short_id: info}) and link them to a topic.
+
+        Only papers not already in the store are written. Returns the number
+        of new papers.
+        """
+        with self._write() as conn:
+            return self._add_papers_locked(conn, topic, papers_info)
+
+    @staticmethod
+    def _add_papers_locked(conn, topic, papers_info):
+        before = conn.total_changes
+        cursor = conn.executemany(
+            "INSERT INTO papers (id, title, authors, summary, pdf_url, published) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO NOTHING",
+            [
+                (paper_id, info['title'], json.dumps(info['authors']), info['summary'],
+                 info.get('pdf_url'), info.get('published'))
+                for paper_id, info in papers_info.items()
+            ],
+        )
+        # rowcount, unlike total_changes, leaves out the FTS trigger writes
+        added = cursor.rowcount
+        conn.executemany(
+            "INSERT OR IGNORE INTO topic_papers (topic, paper_id) VALUES (?, ?)",
+            [(topic_key(topic), paper_id) for paper_id in papers_info],
+        )
+        if conn.total_changes != before:
+            # Bump the version so cached renderings of the store are invalidated
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        return added
+
+    def version(self):
+        """Counter that changes whenever papers or topic links are added"""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row['value']) if row else 0
+
+    def get_paper(self, paper_id):
+        """Return the info dict for a paper, or None"""
+        row = self._conn().execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def topics(self):
+        """List topics that have at least one paper"""
+        rows = self._conn().execute("SELECT DISTINCT topic FROM topic_papers ORDER BY topic")
+        return [row['topic'] for row in rows]
+
+    def topic_papers(self, topic, limit=None, offset=0):
+        """Return {short_id: info} for a topic, in insertion order"""
+        rows = self._conn().execute(
+            "SELECT p.* FROM topic_papers t JOIN papers p ON p.id = t.paper_id "
+            "WHERE t.topic = ? ORDER BY t.rowid LIMIT ? OFFSET ?",
+            (topic_key(topic), -1 if limit is None else limit, offset),
+        )
+        return {row['id']: self._row_to_info(row) for row in rows}
+
+    def count_topic_papers(self, topic):
+        row = self._conn().execute(
+            "SELECT COUNT(*) AS n FROM topic_papers WHERE topic = ?", (topic_key(topic),)
+        ).fetchone()
+        return row['n']
+
+    def search(self, query, limit=10, topic=None):
+        """BM25-ranked full-text search; returns [(short_id, info, score)] best first"""
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return []
+        # Quote every token so user input can't inject FTS5 query syntax
+        match = " OR ".join('"{}"'.format(token.replace('"', '""')) for token in tokens)
+        # Rank inside the FTS index first and only join the top `limit` rows
+        where = "papers_fts MATCH ?"
+        params = [*FTS_WEIGHTS, match]
+        if topic:
+            where += " AND rowid IN (SELECT p.rowid FROM topic_papers t JOIN papers p ON p.id = t.paper_id WHERE t.topic = ?)"
+            params.append(topic_key(topic))
+        params.append(limit)
+        sql = (
+            "SELECT p.*, hits.score FROM ("
+            f"SELECT rowid, bm25(papers_fts, ?, ?, ?) AS score FROM papers_fts WHERE {where} "
+            "ORDER BY score LIMIT ?"
+            ") AS hits JOIN papers p ON p.rowid = hits.rowid ORDER BY hits.score"
+        )
+        rows = self._conn().execute(sql, params)
+        # FTS5 reports bm25 as a negative number; lower is better
+        return [(row['id'], self._row_to_info(row), -row['score']) for row in rows]
+
+    def import_json_dir(self, paper_dir):
+        """Import legacy papers/<topic>/papers_info.json files; returns the paper count"""
+        with self._write() as conn:
+            return self._import_json_dir_locked(conn, paper_dir)
+
+    def _import_json_dir_locked(self, conn, paper_dir):
+        count = 0
+        if not os.path.isdir(paper_dir):
+            return count
+        for item in sorted(os.listdir(paper_dir)):
+            file_path = os.path.join(paper_dir, item, "papers_info.json")
+            if not os.path.isfile(file_path):
+                continue
+            try:
+                with open(file_path, "r") as json_file:
+                    papers_info = json.load(json_file)
+            except json.JSONDecodeError as e:
+                print(f"Error reading {file_path}: {str(e)}", file=sys.stderr)
+                continue
+            self._add_papers_locked(conn, item, papers_info)
+            count += len(papers_info)
+        return count
+
+    def migrate_json_dir(self, paper_dir):
+        """Run import_json_dir once per store; later calls are no-ops"""
+        # The check and the import share one write transaction, so two servers
+        # starting at the same time don't both import
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return 0
+            count = self._import_json_dir_locked(conn, paper_dir)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)", (str(count),))
+            return count
+
+
+if __name__ == "__main__":
+    # Usage: python paper_store.py [papers_dir]  -- (re)import papers_info.json files
+    paper_dir = sys.argv[1] if len(sys.argv) > 1 else "papers"
+    store = PaperStore(os.path.join(paper_dir, "papers.db"))
+    print(f"Imported {store.import_json_dir(paper_dir)} papers into {store.path}")
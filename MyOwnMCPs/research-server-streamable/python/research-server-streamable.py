@@ -1,29 +1,101 @@
-import arxiv
+import asyncio
 import json
 import os
+import sys
+import threading
+import time
 from typing import List
 from mcp.server.fastmcp import FastMCP
+from paper_store import PaperStore, topic_key
 
 PAPER_DIR = "papers"
+PAGE_SIZE = int(os.environ.get("PAPERS_PAGE_SIZE", 20))
+RENDER_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = int(os.environ.get("ARXIV_CACHE_TTL", 3600))
+SEARCH_CACHE_SIZE = 1024
+MAX_LOCAL_RESULTS = 100
+MAX_BATCH_CONCURRENCY = int(os.environ.get("ARXIV_MAX_CONCURRENCY", 8))
+# arXiv asks API clients for no more than one request every 3 seconds
+REQUEST_INTERVAL = float(os.environ.get("ARXIV_REQUEST_INTERVAL", 3.0))
+
+# The arxiv package is imported by the first search. MCP_WARMUP=1 loads it on
+# a background thread MCP_WARMUP_DELAY seconds after start, once the client
+# has finished the handshake
+WARMUP = os.environ.get("MCP_WARMUP") == "1"
+WARMUP_DELAY = float(os.environ.get("MCP_WARMUP_DELAY", 1.0))
+
+# All papers live in one SQLite store keyed by short ID; existing
+# papers/<topic>/papers_info.json files are imported on first start
+store = PaperStore(os.path.join(PAPER_DIR, "papers.db"))
+store.migrate_json_dir(PAPER_DIR)
+
+# Rendered papers:// resources, tagged with the store version they were built from
+_render_cache = {}
 
 # Initialize FastMCP server
 mcp = FastMCP("research", port=8001, host='0.0.0.0')
 
-@mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
-    """
-    Search for papers on arXiv based on a topic and store their information.
-    
-    Args:
-        topic: The topic to search for
-        max_results: Maximum number of results to retrieve (default: 5)
-        
-    Returns:
-        List of paper IDs found in the search
+# One arXiv client for the whole server, so its HTTP session and request
+# pacing carry over between searches. The client is not thread-safe, so
+# searches on worker threads take turns on _arxiv_request_lock; that also
+# keeps the client's 3 s delay between requests process-wide
+_arxiv = None
+_arxiv_client = None
+_arxiv_client_lock = threading.Lock()
+_arxiv_request_lock = threading.Lock()
+
+class RequestPacer:
+    """Process-wide arXiv rate limit: hands out start times `interval` seconds apart.
+
+    Each search reserves the next free slot and sleeps until it comes up, so a
+    batch of topics waits its turn on the event loop instead of hitting arXiv
+    at once. Thread-safe, since searches may come from several event loops.
     """
-    
-    # Use arxiv to find the papers 
-    client = arxiv.Client()
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Claim the next slot and return how many seconds until it starts"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.interval
+            return start - now
+
+arxiv_pacer = RequestPacer(REQUEST_INTERVAL)
+
+# (topic, max_results) -> (expires_at, paper_ids) for recent searches
+_search_cache = {}
+# (topic, max_results) -> task for searches currently talking to arXiv
+_search_in_flight = {}
+
+def get_arxiv():
+    global _arxiv
+    with _arxiv_client_lock:
+        if _arxiv is None:
+            # ARXIV_BACKEND=fake swaps in an offline, deterministic arXiv for tests and benchmarks
+            if os.environ.get("ARXIV_BACKEND") == "fake":
+                import fake_arxiv as arxiv
+            else:
+                import arxiv
+            _arxiv = arxiv
+        return _arxiv
+
+def get_arxiv_client():
+    global _arxiv_client
+    arxiv = get_arxiv()
+    with _arxiv_client_lock:
+        if _arxiv_client is None:
+            _arxiv_client = arxiv.Client(delay_seconds=REQUEST_INTERVAL)
+        return _arxiv_client
+
+def fetch_and_store(topic: str, max_results: int) -> List[str]:
+    """Blocking part of search_papers: query arXiv and save the results"""
+    arxiv = get_arxiv()
+    client = get_arxiv_client()
 
     # Search for the most relevant articles matching the queried topic
     search = arxiv.Search(
@@ -32,23 +104,13 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
         sort_by = arxiv.SortCriterion.Relevance
     )
 
-    papers = client.results(search)
-    
-    # Create directory for this topic
-    path = os.path.join(PAPER_DIR, topic.lower().replace(" ", "_"))
-    os.makedirs(path, exist_ok=True)
+    # results() is lazy and fetches pages as it is iterated, so drain it under the lock
+    with _arxiv_request_lock:
+        papers = list(client.results(search))
     
-    file_path = os.path.join(path, "papers_info.json")
-
-    # Try to load existing papers info
-    try:
-        with open(file_path, "r") as json_file:
-            papers_info = json.load(json_file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
-
     # Process each paper and add to papers_info  
     paper_ids = []
+    papers_info = {}
     for paper in papers:
         paper_ids.append(paper.get_short_id())
         paper_info = {
@@ -60,14 +122,124 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
         }
         papers_info[paper.get_short_id()] = paper_info
     
-    # Save updated papers_info to json file
-    with open(file_path, "w") as json_file:
-        json.dump(papers_info, json_file, indent=2)
+    # Save the papers to the store under this topic; only new records are written
+    added = store.add_papers(topic, papers_info)
     
-    print(f"Results are saved in: {file_path}")
+    # stdout carries the stdio MCP transport, so progress goes to stderr
+    print(f"Results are saved in: {store.path} ({added} new papers)", file=sys.stderr)
     
     return paper_ids
 
+def remember_search(key, paper_ids):
+    now = time.monotonic()
+    if len(_search_cache) >= SEARCH_CACHE_SIZE:
+        for stale in [k for k, (expires, _) in _search_cache.items() if expires <= now]:
+            del _search_cache[stale]
+        if len(_search_cache) >= SEARCH_CACHE_SIZE:
+            _search_cache.pop(next(iter(_search_cache)))
+    _search_cache[key] = (now + SEARCH_CACHE_TTL, paper_ids)
+
+def search_query(topic):
+    """arXiv query for a topic: the caller's text with whitespace collapsed.
+    Case is kept so AND/OR/ANDNOT still work; only the cache and store use topic_key"""
+    return " ".join(topic.split())
+
+async def paced_fetch(topic: str, max_results: int) -> List[str]:
+    """fetch_and_store on a worker thread once arxiv_pacer gives this search its slot"""
+    delay = arxiv_pacer.reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    # arXiv requests and SQLite writes block, so run them off the event loop
+    return await asyncio.to_thread(fetch_and_store, search_query(topic), max_results)
+
+async def run_search(topic: str, max_results: int):
+    """Memoized, de-duplicated search; returns (paper_ids, served_from_cache)"""
+    key = (topic_key(topic), max_results)
+    hit = _search_cache.get(key)
+    if hit and hit[0] > time.monotonic():
+        return list(hit[1]), True
+
+    # Identical searches already in progress share one arXiv round trip
+    task = _search_in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(paced_fetch(topic, max_results))
+        _search_in_flight[key] = task
+        try:
+            paper_ids = await asyncio.shield(task)
+        finally:
+            _search_in_flight.pop(key, None)
+        remember_search(key, paper_ids)
+    else:
+        paper_ids = await asyncio.shield(task)
+
+    return list(paper_ids), False
+
+@mcp.tool()
+async def search_papers(topic: str, max_results: int = 5) -> List[str]:
+    """
+    Search for papers on arXiv based on a topic and store their information.
+    
+    Args:
+        topic: The topic to search for
+        max_results: Maximum number of results to retrieve (default: 5)
+        
+    Returns:
+        List of paper IDs found in the search
+    """
+    paper_ids, _ = await run_search(topic, max_results)
+    return paper_ids
+
+@mcp.tool()
+async def search_papers_batch(topics: List[str], max_results: int = 5, max_concurrency: int = 4) -> str:
+    """
+    Search arXiv for several related topics at once and store their papers.
+    
+    Topics run concurrently (at most max_concurrency at a time), but requests to
+    arXiv still start at most one per ARXIV_REQUEST_INTERVAL seconds (default 3)
+    across the whole server. Cached topics return at once. A paper found under
+    several topics is stored once and linked to each of them.
+    
+    Args:
+        topics: The topics to search for
+        max_results: Maximum number of results per topic (default: 5)
+        max_concurrency: How many topics to query in parallel (default: 4)
+        
+    Returns:
+        JSON report with the paper IDs and timing for each topic
+    """
+    semaphore = asyncio.Semaphore(max(1, min(max_concurrency, MAX_BATCH_CONCURRENCY)))
+    # Topics that normalize to the same folder are only searched once
+    unique_topics = list({topic_key(topic): topic for topic in topics}.values())
+
+    async def run_one(topic):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                paper_ids, cached = await run_search(topic, max_results)
+                error = None
+            except Exception as e:
+                paper_ids, cached, error = [], False, str(e)
+            report = {
+                'topic': topic,
+                'paper_ids': paper_ids,
+                'cached': cached,
+                'seconds': round(time.perf_counter() - started, 3),
+            }
+            if error:
+                report['error'] = error
+            return report
+
+    started = time.perf_counter()
+    reports = await asyncio.gather(*(run_one(topic) for topic in unique_topics))
+    found = [paper_id for report in reports for paper_id in report['paper_ids']]
+    
+    return json.dumps({
+        'topics': reports,
+        'unique_papers': len(set(found)),
+        'shared_papers': len(found) - len(set(found)),
+        'total_seconds': round(time.perf_counter() - started, 3),
+    }, indent=2)
+
 @mcp.tool()
 def extract_info(paper_id: str) -> str:
     """
@@ -80,87 +252,142 @@ def extract_info(paper_id: str) -> str:
         JSON string with paper information if found, error message if not found
     """
  
-    for item in os.listdir(PAPER_DIR):
-        item_path = os.path.join(PAPER_DIR, item)
-        if os.path.isdir(item_path):
-            file_path = os.path.join(item_path, "papers_info.json")
-            if os.path.isfile(file_path):
-                try:
-                    with open(file_path, "r") as json_file:
-                        papers_info = json.load(json_file)
-                        if paper_id in papers_info:
-                            return json.dumps(papers_info[paper_id], indent=2)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"Error reading {file_path}: {str(e)}")
-                    continue
+    paper_info = store.get_paper(paper_id)
+    if paper_info:
+        return json.dumps(paper_info, indent=2)
     
     return f"There's no saved information related to paper {paper_id}."
 
-
-
-@mcp.resource("papers://folders")
-def get_available_folders() -> str:
+@mcp.tool()
+def search_local_papers(query: str, limit: int = 10, topic: str = "") -> str:
     """
-    List all available topic folders in the papers directory.
+    Full-text search over the papers already stored locally, ranked by BM25.
     
-    This resource provides a simple list of all available topic folders.
+    Matches the query against paper titles, authors and summaries without
+    contacting arXiv.
+    
+    Args:
+        query: Free-text query, e.g. "graph neural networks molecules"
+        limit: Maximum number of results to return (default: 10, at most 100)
+        topic: Optionally restrict the search to one topic
+        
+    Returns:
+        JSON list of matching papers, best match first
     """
-    folders = []
+    limit = max(1, min(int(limit), MAX_LOCAL_RESULTS))
+    results = store.search(query, limit=limit, topic=topic or None)
+    if not results:
+        return f"No stored papers match '{query}'."
     
-    # Get all topic directories
-    if os.path.exists(PAPER_DIR):
-        for topic_dir in os.listdir(PAPER_DIR):
-            topic_path = os.path.join(PAPER_DIR, topic_dir)
-            if os.path.isdir(topic_path):
-                papers_file = os.path.join(topic_path, "papers_info.json")
-                if os.path.exists(papers_file):
-                    folders.append(topic_dir)
+    return json.dumps([
+        {
+            'paper_id': paper_id,
+            'title': paper_info['title'],
+            'authors': paper_info['authors'],
+            'published': paper_info['published'],
+            'score': round(score, 4),
+        }
+        for paper_id, paper_info, score in results
+    ], indent=2)
+
+
+
+def cached_render(key, render):
+    """Return render() output, reusing it until the store version changes"""
+    version = store.version()
+    hit = _render_cache.get(key)
+    if hit and hit[0] == version:
+        return hit[1]
+    content = render()
+    if len(_render_cache) >= RENDER_CACHE_SIZE:
+        _render_cache.pop(next(iter(_render_cache)))
+    _render_cache[key] = (version, content)
+    return content
+
+def render_folders() -> str:
+    folders = store.topics()
     
     # Create a simple markdown list
-    content = "# Available Topics\n\n"
+    parts = ["# Available Topics\n\n"]
     if folders:
-        for folder in folders:
-            content += f"- {folder}\n"
-        # content += f"\nUse @{folder} to access papers in that topic.\n"
+        parts.extend(f"- {folder}\n" for folder in folders)
     else:
-        content += "No topics found.\n"
+        parts.append("No topics found.\n")
     
-    return content
+    return "".join(parts)
+
+def render_topic_page(topic: str, page: int) -> str:
+    total = store.count_topic_papers(topic)
+    
+    if not total:
+        return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
+    
+    pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    if page < 1 or page > pages:
+        return f"# Page {page} not found for topic: {topic}\n\nThis topic has {pages} page(s)."
+    papers_data = store.topic_papers(topic, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+    
+    # Create markdown content with paper details
+    parts = [
+        f"# Papers on {topic.replace('_', ' ').title()}\n\n",
+        f"Total papers: {total}\n\n",
+    ]
+    if pages > 1:
+        parts.append(f"Page {page} of {pages}\n\n")
+    
+    for paper_id, paper_info in papers_data.items():
+        parts.append(
+            f"## {paper_info['title']}\n"
+            f"- **Paper ID**: {paper_id}\n"
+            f"- **Authors**: {', '.join(paper_info['authors'])}\n"
+            f"- **Published**: {paper_info['published']}\n"
+            f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
+            f"### Summary\n{paper_info['summary'][:500]}...\n\n"
+            "---\n\n"
+        )
+    
+    if page < pages:
+        parts.append(f"Next page: papers://{topic_key(topic)}/page/{page + 1}\n")
+    
+    return "".join(parts)
+
+@mcp.resource("papers://folders")
+def get_available_folders() -> str:
+    """
+    List all available topic folders in the papers directory.
+    
+    This resource provides a simple list of all available topic folders.
+    """
+    return cached_render(("folders",), render_folders)
 
 @mcp.resource("papers://{topic}")
 def get_topic_papers(topic: str) -> str:
     """
     Get detailed information about papers on a specific topic.
     
+    Large topics are paginated; the first page links to papers://{topic}/page/2.
+    
     Args:
         topic: The research topic to retrieve papers for
     """
-    topic_dir = topic.lower().replace(" ", "_")
-    papers_file = os.path.join(PAPER_DIR, topic_dir, "papers_info.json")
-    
-    if not os.path.exists(papers_file):
-        return f"# No papers found for topic: {topic}\n\nTry searching for papers on this topic first."
+    return get_topic_papers_page(topic, 1)
+
+@mcp.resource("papers://{topic}/page/{page}")
+def get_topic_papers_page(topic: str, page: int) -> str:
+    """
+    Get one page of papers on a specific topic.
     
+    Args:
+        topic: The research topic to retrieve papers for
+        page: 1-based page number
+    """
     try:
-        with open(papers_file, 'r') as f:
-            papers_data = json.load(f)
-        
-        # Create markdown content with paper details
-        content = f"# Papers on {topic.replace('_', ' ').title()}\n\n"
-        content += f"Total papers: {len(papers_data)}\n\n"
-        
-        for paper_id, paper_info in papers_data.items():
-            content += f"## {paper_info['title']}\n"
-            content += f"- **Paper ID**: {paper_id}\n"
-            content += f"- **Authors**: {', '.join(paper_info['authors'])}\n"
-            content += f"- **Published**: {paper_info['published']}\n"
-            content += f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
-            content += f"### Summary\n{paper_info['summary'][:500]}...\n\n"
-            content += "---\n\n"
-        
-        return content
-    except json.JSONDecodeError:
-        return f"# Error reading papers data for {topic}\n\nThe papers data file is corrupted."
+        page = int(page)
+    except ValueError:
+        return f"Invalid page: {page}"
+    # Render from the key so every spelling of a topic shares one cached page
+    key = topic_key(topic)
+    return cached_render(("topic", key, page), lambda: render_topic_page(key, page))
 
 @mcp.prompt()
 def generate_search_prompt(topic: str, num_papers: int = 5) -> str:
@@ -188,6 +415,18 @@ Follow these instructions:
 
 Please present both detailed information about each paper and a high-level synthesis of the research landscape in {topic}."""
 
+# Helper: import the slow dependencies in the background after startup
+def start_warm_up():
+    def run():
+        time.sleep(WARMUP_DELAY)
+        try:
+            get_arxiv_client()
+        except Exception:
+            pass  # The first search will import it (and report any error)
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+
 if __name__ == "__main__":
-    # Initialize and run the server
-    mcp.run(transport='streamable-http')
\ No newline at end of file
+    if WARMUP:
+        start_warm_up()
+    # Initialize and run the server; MCP_TRANSPORT=stdio serves a local client instead
+    mcp.run(transport=os.environ.get("MCP_TRANSPORT", "streamable-http"))
\ No newline at end of file
@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    exhausted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    query TEXT NOT NULL REFERENCES queries(query),
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (query, position)
+);
+"""
+
+
+def query_key(query):
+    """Normalize case and whitespace so trivially different queries share a cache entry"""
+    return " ".join(query.lower().split())
+
+
+class ScholarCache:
+    """SQLite cache of structured Google Scholar results, per query and position.
+
+    Results for a query are stored as a growing prefix of the full result
+    list: later pages are appended as they are fetched, and `exhausted`
+    records that Scholar had nothing more to give. A query's results expire
+    together `ttl` seconds after its first page was fetched.
+    """
+
+    def __init__(self, path, ttl=7 * 86400):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly in _write()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def state(self, key):
+        """Return (cached_count, exhausted) for a query, dropping it first if expired"""
+        row = self._conn().execute(
+            "SELECT fetched_at, exhausted FROM queries WHERE query = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return 0, False
+        if time.time() - row[0] > self.ttl:
+            self.expire(key)
+            return 0, False
+        count = self._conn().execute(
+            "SELECT COUNT(*) FROM results WHERE query = ?", (key,)
+        ).fetchone()[0]
+        return count, bool(row[1])
+
+    def page(self, key, offset, limit):
+        rows = self._conn().execute(
+            "SELECT data FROM results WHERE query = ? AND position >= ? ORDER BY position LIMIT ?",
+            (key, offset, limit),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def append(self, key, start, records, exhausted):
+        """Store records at positions start, start+1, ... and update the exhausted flag"""
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO queries (query, fetched_at, exhausted) VALUES (?, ?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET exhausted = excluded.exhausted",
+                (key, time.time(), int(exhausted)),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (query, position, data) VALUES (?, ?, ?)",
+                [(key, start + i, json.dumps(record)) for i, record in enumerate(records)],
+            )
+
+    def expire(self, key):
+        with self._write() as conn:
+            conn.execute("DELETE FROM results WHERE query = ?", (key,))
+            conn.execute("DELETE FROM queries WHERE query = ?", (key,))
+
+    def purge_expired(self):
+        """Delete every expired query; returns how many were removed"""
+        cutoff = time.time() - self.ttl
+        with self._write() as conn:
+            conn.execute(
+                "DELETE FROM results WHERE query IN (SELECT query FROM queries WHERE fetched_at < ?)",
+                (cutoff,),
+            )
+            return conn.execute("DELETE FROM queries WHERE fetched_at < ?", (cutoff,)).rowcount
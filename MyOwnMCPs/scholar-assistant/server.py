@@ -1,59 +1,150 @@
+import os
+import threading
+import time
+from collections import OrderedDict
 from fastmcp import FastMCP
-from scholarly import scholarly
+from scholar_cache import ScholarCache, query_key
+
+CACHE_PATH = os.environ.get(
+    "SCHOLAR_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scholar_cache.db"))
+CACHE_TTL = int(os.environ.get("SCHOLAR_CACHE_TTL", 7 * 86400))
+MAX_LIVE_SEARCHES = 32
+
+# scholarly takes about a second to import, so it is loaded by the first search
+# that misses the cache. MCP_WARMUP=1 loads it on a background thread
+# MCP_WARMUP_DELAY seconds after start, once the client has finished the handshake
+WARMUP = os.environ.get("MCP_WARMUP") == "1"
+WARMUP_DELAY = float(os.environ.get("MCP_WARMUP_DELAY", 1.0))
 
 mcp = FastMCP("ScholarAssistant")
 
+# Structured results already fetched from Scholar, shared across runs
+cache = ScholarCache(CACHE_PATH, ttl=CACHE_TTL)
+
+# query -> (next_position, generator) for searches that can still yield more
+# results, so the next page continues where the last one stopped
+_live_searches = OrderedDict()
+_live_lock = threading.Lock()
+# Striped locks so two calls for the same query never fetch the same page twice
+_query_locks = [threading.Lock() for _ in range(64)]
+
+_scholarly = None
+_scholarly_lock = threading.Lock()
+
+def get_scholarly():
+    global _scholarly
+    with _scholarly_lock:
+        if _scholarly is None:
+            # SCHOLAR_BACKEND=stub swaps in an offline, deterministic Scholar for tests and benchmarks
+            if os.environ.get("SCHOLAR_BACKEND") == "stub":
+                from stub_scholarly import scholarly
+            else:
+                from scholarly import scholarly
+            _scholarly = scholarly
+        return _scholarly
+
+def pub_to_record(pub):
+    """Extract the fields we cite from a scholarly publication dict"""
+    bib = pub.get('bib', {})
+    # Authors can be a list or string
+    authors = bib.get('author', ['Unknown Author'])
+    if isinstance(authors, str):
+        authors = [authors]
+    return {
+        'title': bib.get('title', 'Unknown Title'),
+        'authors': authors,
+        'year': bib.get('pub_year', 'n.d.'),
+        'venue': bib.get('venue', ''),  # Journal or conference
+        'url': pub.get('pub_url', 'No URL'),
+        'citations': pub.get('num_citations'),
+    }
+
+def format_citation(record):
+    return (
+        f"**Title**: {record['title']}\n"
+        f"**Authors**: {', '.join(record['authors'])}\n"
+        f"**Year**: {record['year']}\n"
+        f"**Venue**: {record['venue']}\n"
+        f"**Link**: {record['url']}"
+    )
+
+def fetch_results(query, offset, limit):
+    """Return (records, has_more) for results offset..offset+limit of a query.
+
+    Only results missing from the cache are requested from Scholar, and
+    they are stored before being returned.
+    """
+    key = query_key(query)
+    with _query_locks[hash(key) % len(_query_locks)]:
+        count, exhausted = cache.state(key)
+        needed = offset + limit
+        if count < needed and not exhausted:
+            with _live_lock:
+                live = _live_searches.pop(key, None)
+            if live is not None and live[0] == count:
+                results = live[1]
+            else:
+                # start_index skips the pages already cached
+                results = get_scholarly().search_pubs(query, start_index=count)
+
+            records = []
+            try:
+                while count + len(records) < needed:
+                    try:
+                        records.append(pub_to_record(next(results)))
+                    except StopIteration:
+                        exhausted = True
+                        break
+            finally:
+                # Keep whatever was fetched, even if Scholar failed part way
+                if records or exhausted:
+                    cache.append(key, count, records, exhausted)
+            count += len(records)
+
+            if not exhausted:
+                with _live_lock:
+                    _live_searches[key] = (count, results)
+                    while len(_live_searches) > MAX_LIVE_SEARCHES:
+                        _live_searches.popitem(last=False)
+
+        has_more = not exhausted or count > needed
+        return cache.page(key, offset, limit), has_more
+
 @mcp.tool()
-def search_scholar(query: str, limit: int = 5) -> str:
+def search_scholar(query: str, limit: int = 5, offset: int = 0) -> str:
     """
     Search Google Scholar for a natural language query and return bibliographic references.
-    
+
     Args:
         query: The search query string.
         limit: The maximum number of results to return (default 5).
+        offset: How many results to skip, for fetching further pages (default 0).
     """
     try:
-        # returns a generator
-        search_query = scholarly.search_pubs(query)
-        results = []
-        
-        count = 0
-        for pub in search_query:
-            if count >= limit:
-                break
-            
-            # Extract relevant info safely
-            bib = pub.get('bib', {})
-            title = bib.get('title', 'Unknown Title')
-            
-            # Authors can be a list or string
-            authors = bib.get('author', ['Unknown Author'])
-            if isinstance(authors, list):
-                authors = ', '.join(authors)
-            
-            pub_year = bib.get('pub_year', 'n.d.')
-            venue = bib.get('venue', '') # Journal or conference
-            pub_url = pub.get('pub_url', 'No URL')
-            
-            # Construct a formatted string
-            citation = (
-                f"**Title**: {title}\n"
-                f"**Authors**: {authors}\n"
-                f"**Year**: {pub_year}\n"
-                f"**Venue**: {venue}\n"
-                f"**Link**: {pub_url}"
-            )
-            
-            results.append(citation)
-            count += 1
-            
-        if not results:
+        records, has_more = fetch_results(query, max(offset, 0), max(limit, 0))
+
+        if not records:
             return "No results found."
-            
-        return "\n\n---\n\n".join(results)
+
+        text = "\n\n---\n\n".join(format_citation(record) for record in records)
+        if has_more:
+            text += f"\n\n(More results available: call again with offset={offset + len(records)})"
+        return text
 
     except Exception as e:
         return f"Error searching Google Scholar: {str(e)}"
 
+# Helper: import the slow dependencies in the background after startup
+def start_warm_up():
+    def run():
+        time.sleep(WARMUP_DELAY)
+        try:
+            get_scholarly()
+        except Exception:
+            pass  # The first search will import it (and report any error)
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+
 if __name__ == "__main__":
+    if WARMUP:
+        start_warm_up()
     mcp.run()
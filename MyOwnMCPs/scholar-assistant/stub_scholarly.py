@@ -0,0 +1,43 @@
+"""Offline stand-in for `scholarly`, used when SCHOLAR_BACKEND=stub.
+
+search_pubs yields STUB_SCHOLAR_RESULTS deterministic publications per
+query, sleeping STUB_SCHOLAR_LATENCY seconds whenever a new page of 10 is
+"fetched", like the real library does when it loads the next results page.
+"""
+import os
+import time
+import zlib
+
+RESULTS = int(os.environ.get("STUB_SCHOLAR_RESULTS", 50))
+LATENCY = float(os.environ.get("STUB_SCHOLAR_LATENCY", 0.0))
+PAGE_SIZE = 10
+
+
+class _StubScholarly:
+    def __init__(self, results=None, latency=None):
+        self.results = RESULTS if results is None else results
+        self.latency = LATENCY if latency is None else latency
+        self.pages_fetched = 0
+
+    def search_pubs(self, query, start_index=0, **kwargs):
+        seed = zlib.crc32(query.lower().encode("utf-8"))
+        for i in range(start_index, self.results):
+            if (i - start_index) % PAGE_SIZE == 0:
+                self.pages_fetched += 1
+                if self.latency:
+                    time.sleep(self.latency)
+            n = (seed + i) % 100000
+            yield {
+                'bib': {
+                    'title': f"Stub publication {n} on {query}",
+                    'author': [f"A Author{n % 97}", f"B Author{n % 31}"],
+                    'pub_year': str(1990 + n % 35),
+                    'venue': f"Journal of Stub Studies {n % 12}",
+                    'abstract': f"Synthetic abstract for result {i} of '{query}'.",
+                },
+                'pub_url': f"https://example.org/pub/{n}",
+                'num_citations': n % 500,
+            }
+
+
+scholarly = _StubScholarly()
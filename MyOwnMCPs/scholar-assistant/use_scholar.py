@@ -1,5 +1,33 @@
-from server import search_scholar
-import sys
+from server import search_scholar, fetch_results
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+class RateLimiter:
+    """Token bucket shared by the batch workers: `rate` queries per second, bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next query may start"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
 
 def run_queries():
     queries = [
@@ -22,5 +50,108 @@ def run_queries():
                 f.write(f"Error: {e}\n")
         f.write("\n--- END SEARCH ---\n")
 
+# Helper: read one query per line, skipping blanks, comments and repeats
+def load_queries(path):
+    queries = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith("#") and query not in seen:
+                seen.add(query)
+                queries.append(query)
+    return queries
+
+# Helper: queries that already finished successfully in an earlier run
+def load_checkpoint(path):
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("ok"):
+                done.add(record["query"])
+    return done
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def run_batch(queries_file, checkpoint="scholar_results.jsonl", workers=4, rate=0.5, limit=3):
+    """Run every query in queries_file through a bounded, rate-limited worker pool.
+
+    Each finished query is appended to the JSONL checkpoint as soon as it
+    completes, so rerunning the same command resumes where it stopped.
+    """
+    queries = load_queries(queries_file)
+    done = load_checkpoint(checkpoint)
+    pending = [q for q in queries if q not in done]
+    print(f"{len(queries)} queries, {len(queries) - len(pending)} already done, {len(pending)} to run "
+          f"({workers} workers, {rate} queries/s)")
+
+    bucket = RateLimiter(rate, max(1, workers))
+    write_lock = threading.Lock()
+    latencies = []
+    failures = 0
+
+    def run_one(query):
+        bucket.acquire()
+        started = time.perf_counter()
+        try:
+            records, _ = fetch_results(query, 0, limit)
+            record = {"query": query, "ok": True, "results": records}
+        except Exception as e:
+            record = {"query": query, "ok": False, "error": str(e)}
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        with write_lock:
+            with open(checkpoint, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(run_one, query) for query in pending]
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            latencies.append(record["seconds"])
+            if not record["ok"]:
+                failures += 1
+                print(f"[{i}/{len(pending)}] FAILED {record['query']}: {record['error']}")
+            else:
+                print(f"[{i}/{len(pending)}] {record['query']} ({len(record['results'])} results, {record['seconds']}s)")
+    except KeyboardInterrupt:
+        print("Interrupted; finished queries are saved, rerun to resume.")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"\nCompleted {len(latencies)} queries ({failures} failed) in {elapsed:.1f}s "
+          f"-> {len(latencies) / elapsed if elapsed else 0:.2f} queries/s")
+    print(f"Latency p50={percentile(latencies, 50):.3f}s p90={percentile(latencies, 90):.3f}s "
+          f"p99={percentile(latencies, 99):.3f}s")
+    print(f"Results are saved in: {checkpoint}")
+
 if __name__ == "__main__":
-    run_queries()
+    parser = argparse.ArgumentParser(description="Run Google Scholar searches; without --queries runs the built-in list")
+    parser.add_argument("--queries", help="Text file with one query per line (enables batch mode)")
+    parser.add_argument("--checkpoint", default="scholar_results.jsonl", help="JSONL file results are appended to and resumed from")
+    parser.add_argument("--workers", type=int, default=4, help="Queries run in parallel")
+    parser.add_argument("--rate", type=float, default=0.5, help="Maximum queries started per second")
+    parser.add_argument("--limit", type=int, default=3, help="Results per query")
+    args = parser.parse_args()
+
+    if args.queries:
+        run_batch(args.queries, args.checkpoint, args.workers, args.rate, args.limit)
+    else:
+        run_queries()
@@ -1,6 +1,8 @@
 import sys
 import os
-import yt_dlp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ytdlp_common.extract_cache import ExtractCache, canonical_key, load_ytdlp
 
 def download_video(url, output_folder="videos"):
     if not os.path.exists(output_folder):
@@ -11,8 +13,17 @@ def download_video(url, output_folder="videos"):
         'format': 'best',
     }
     
+    # Metadata extracted earlier by the MCP server or the subtitle app is reused;
+    # anything else (playlists included) is extracted and downloaded in one pass
+    info_cache = ExtractCache.from_env()
+    yt_dlp = load_ytdlp()
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
+        cached = info_cache.get(canonical_key(url))
+        if cached is not None:
+            info = ydl.process_ie_result(cached, download=True)
+        else:
+            info = ydl.extract_info(url, download=True)
+            info_cache.set(canonical_key(url), info)
         print(f"Downloaded: {info['title']}")
         return info['title']
 
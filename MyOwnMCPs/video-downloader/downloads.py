@@ -0,0 +1,337 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ytdlp_common.extract_cache import canonical_key, load_ytdlp
+from ytdlp_common.ids import youtube_id
+
+# Item and batch states
+PENDING, RUNNING, DONE, SKIPPED, ERROR, CANCELLED = 'pending', 'running', 'done', 'skipped', 'error', 'cancelled'
+STATES = (PENDING, RUNNING, DONE, SKIPPED, ERROR, CANCELLED)
+
+
+class Item:
+    """One video of a download batch, updated from yt-dlp progress hooks"""
+
+    def __init__(self, index, url, video_id=None, title=None, extractor=None):
+        self.index = index
+        self.url = url
+        self.video_id = video_id
+        self.title = title
+        self.extractor = extractor
+        self.status = PENDING
+        self.downloaded_bytes = 0
+        self.total_bytes = None
+        self.speed = None
+        self.eta = None
+        self.tmpfilename = None
+        self.size = None
+        self.duration = None
+        self.filepath = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def progress_hook(self, d):
+        if d['status'] == 'downloading':
+            self.downloaded_bytes = d.get('downloaded_bytes') or 0
+            self.total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
+            self.speed = d.get('speed')
+            self.eta = d.get('eta')
+            self.tmpfilename = d.get('tmpfilename')
+        elif d['status'] == 'finished':
+            self.filepath = d.get('filename')
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        seconds = end - self.started_at if self.started_at else 0.0
+        data = {
+            'index': self.index,
+            'url': self.url,
+            'id': self.video_id,
+            'title': self.title,
+            'status': self.status,
+            'seconds': round(seconds, 2),
+        }
+        if self.status == RUNNING:
+            data['downloaded_bytes'] = self.downloaded_bytes
+            data['total_bytes'] = self.total_bytes
+            data['speed'] = round(self.speed) if self.speed else None
+            data['eta'] = self.eta
+        elif self.status == DONE or self.filepath:
+            data['size'] = self.size
+            data['duration'] = self.duration
+            data['path'] = self.filepath
+            data['mb_per_s'] = round(self.size / seconds / 1e6, 3) if self.size and seconds else None
+        elif self.error:
+            data['error'] = self.error
+        return data
+
+
+class Batch:
+    """A download_video request: one video, or the first entries of a playlist"""
+
+    def __init__(self, url, audio_only=False, max_items=5):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.audio_only = audio_only
+        self.max_items = max_items
+        self.title = None
+        self.status = PENDING
+        self.items = []
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        """Ask the batch to stop; running downloads abort at their next progress update"""
+        self.cancel_event.set()
+
+    def to_dict(self):
+        items = [item.to_dict() for item in self.items]
+        counts = {state: 0 for state in STATES}
+        for item in items:
+            counts[item['status']] += 1
+        total_bytes = sum(item.get('size') or 0 for item in items if item['status'] == DONE)
+        downloaded_bytes = total_bytes + sum(item.get('downloaded_bytes') or 0 for item in items)
+        speed = sum(item.get('speed') or 0 for item in items)
+        # Time spent waiting in the job queue does not count towards throughput
+        seconds = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        data = {
+            'id': self.id,
+            'url': self.url,
+            'title': self.title,
+            'status': self.status,
+            'counts': counts,
+            'total_bytes': total_bytes,
+            'downloaded_bytes': downloaded_bytes,
+            'speed': speed,
+            'seconds': round(seconds, 2),
+            'mb_per_s': round(total_bytes / seconds / 1e6, 3) if seconds else None,
+            'items': items,
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class BatchRegistry:
+    """Recent batches by id, so progress can be polled while they run"""
+
+    def __init__(self, retention=50):
+        self.retention = retention
+        self._batches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, batch):
+        with self._lock:
+            self._batches[batch.id] = batch
+            # Forget the oldest finished batches beyond the retention limit
+            for batch_id in list(self._batches):
+                if len(self._batches) <= self.retention:
+                    break
+                if self._batches[batch_id].finished_at:
+                    del self._batches[batch_id]
+
+    def get(self, batch_id):
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def all(self):
+        with self._lock:
+            return list(self._batches.values())
+
+    def unfinished(self):
+        with self._lock:
+            return sum(1 for batch in self._batches.values() if not batch.finished_at)
+
+
+class BatchDownloader:
+    """Downloads the entries of a batch in parallel through a Throttle.
+
+    A playlist is first listed flat (no per-video extraction), then each
+    entry is downloaded by its own YoutubeDL on a worker thread. The
+    download archive makes yt-dlp skip videos fetched by an earlier run
+    before it even extracts them.
+
+    With a VideoIndex, finished downloads are recorded in it, and videos it
+    already has on disk are reported as skipped without calling yt-dlp.
+    With an ExtractCache, video metadata extracted earlier (by this server
+    or the other yt-dlp tools) is downloaded from without re-extracting.
+    """
+
+    def __init__(self, throttle, output_folder='videos', archive_dir='.', index=None, info_cache=None):
+        self.throttle = throttle
+        self.output_folder = output_folder
+        self.archive_dir = archive_dir
+        self.index = index
+        self.info_cache = info_cache
+
+    def ydl_opts(self, batch):
+        # Separate archives, so having the video does not skip an audio-only request
+        archive = 'download_archive_audio.txt' if batch.audio_only else 'download_archive.txt'
+        return {
+            'outtmpl': os.path.join(self.output_folder, '%(title)s.%(ext)s'),
+            'format': 'bestaudio/best' if batch.audio_only else 'best',
+            'quiet': True,
+            'no_warnings': True,
+            # quiet alone still draws the progress bar, which would corrupt the stdio transport
+            'noprogress': True,
+            'download_archive': os.path.join(self.archive_dir, archive),
+        }
+
+    def _call(self, url, opts, fn):
+        # Imported on first use so the MCP server starts without loading yt-dlp
+        yt_dlp = load_ytdlp()
+
+        def run(cookiefile):
+            call_opts = dict(opts, cookiefile=cookiefile) if cookiefile else opts
+            with yt_dlp.YoutubeDL(call_opts) as ydl:
+                return fn(ydl)
+        return self.throttle.call(url, run)
+
+    def run(self, batch, max_concurrent=3):
+        """Download every entry of the batch; returns the batch once all items finished"""
+        os.makedirs(self.output_folder, exist_ok=True)
+        opts = self.ydl_opts(batch)
+        batch.started_at = time.time()
+        if batch.cancel_event.is_set():
+            batch.status, batch.finished_at = CANCELLED, time.time()
+            return batch
+        batch.status = RUNNING
+        try:
+            video_id = youtube_id(batch.url)
+            existing = self._find_existing(batch, video_id, 'Youtube' if video_id else None, batch.url)
+            if existing:
+                item = Item(1, batch.url)
+                self._skip_existing(item, existing)
+                batch.items.append(item)
+                batch.title = item.title
+                batch.status, batch.finished_at = DONE, time.time()
+                return batch
+
+            info = self.info_cache.get(canonical_key(batch.url)) if self.info_cache else None
+            if info is None:
+                probe_opts = dict(opts, extract_flat='in_playlist', playlistend=batch.max_items)
+                info = self._call(batch.url, probe_opts, lambda ydl: ydl.extract_info(batch.url, download=False))
+                if self.info_cache and info and 'entries' not in info:
+                    self.info_cache.set(canonical_key(batch.url), info)
+
+            if info is None:
+                # A single video already recorded in the archive
+                item = Item(1, batch.url)
+                item.status = SKIPPED
+                batch.items.append(item)
+            elif 'entries' in info:
+                batch.title = info.get('title', 'Playlist')
+                for index, entry in enumerate(list(info['entries'])[:batch.max_items], 1):
+                    if entry:
+                        url = entry.get('url') or entry.get('webpage_url') or entry.get('id')
+                        batch.items.append(Item(index, url, entry.get('id'), entry.get('title'), entry.get('ie_key')))
+                with ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix='video-dl') as pool:
+                    list(pool.map(lambda item: self.download_item(batch, item, opts), batch.items))
+            else:
+                # Single video: reuse the extraction from the probe instead of repeating it
+                batch.title = info.get('title')
+                item = Item(1, batch.url, info.get('id'), info.get('title'), info.get('extractor_key'))
+                batch.items.append(item)
+                self.download_item(batch, item, opts, info)
+
+            failed = batch.items and all(item.status == ERROR for item in batch.items)
+            if batch.cancel_event.is_set():
+                batch.status = CANCELLED
+            else:
+                batch.status = ERROR if failed else DONE
+        except Exception as e:
+            batch.status, batch.error = ERROR, str(e)
+        batch.finished_at = time.time()
+        return batch
+
+    def download_item(self, batch, item, opts, info=None):
+        if batch.cancel_event.is_set():
+            item.status = CANCELLED
+            return
+        existing = self._find_existing(batch, item.video_id, item.extractor, item.url)
+        if existing:
+            self._skip_existing(item, existing)
+            return
+        DownloadCancelled = load_ytdlp().utils.DownloadCancelled
+        item.status = RUNNING
+        item.started_at = time.time()
+
+        def progress_hook(d):
+            # Raising from a hook is how yt-dlp lets callers abort a download
+            if batch.cancel_event.is_set():
+                raise DownloadCancelled()
+            item.progress_hook(d)
+
+        item_opts = dict(opts, progress_hooks=[progress_hook])
+        try:
+            if info is None:
+                result = self._call(item.url, item_opts, lambda ydl: self._extract_and_download(ydl, item.url))
+            else:
+                result = self._call(item.url, item_opts, lambda ydl: ydl.process_ie_result(info, download=True))
+            self._finish_item(batch, item, result)
+        except DownloadCancelled:
+            item.status = CANCELLED
+            # Drop the partial file; the id never reached the archive
+            if item.tmpfilename and os.path.exists(item.tmpfilename):
+                os.remove(item.tmpfilename)
+        except Exception as e:
+            item.status, item.error = ERROR, str(e)
+        item.finished_at = time.time()
+
+    def _extract_and_download(self, ydl, url):
+        if self.info_cache is None:
+            return ydl.extract_info(url, download=True)
+        info = self.info_cache.extract(ydl, url)
+        # None means the video is already in the download archive
+        return ydl.process_ie_result(info, download=True) if info else None
+
+    def _find_existing(self, batch, video_id, extractor, url):
+        if self.index is None:
+            return None
+        return self.index.find(video_id, extractor, url, batch.audio_only)
+
+    @staticmethod
+    def _skip_existing(item, existing):
+        item.status = SKIPPED
+        item.video_id = existing['id'] or item.video_id
+        item.title = existing['title']
+        item.filepath = existing['path']
+        item.size = existing['size']
+        item.duration = existing['duration']
+
+    def _finish_item(self, batch, item, info):
+        downloads = (info or {}).get('requested_downloads') or []
+        if not downloads:
+            # yt-dlp returns no download when the id is already in the archive
+            item.status = SKIPPED
+            return
+        item.video_id = info.get('id', item.video_id)
+        item.title = info.get('title', item.title)
+        item.duration = info.get('duration')
+        item.filepath = downloads[-1].get('filepath') or item.filepath
+        if item.filepath and os.path.exists(item.filepath):
+            item.filepath = os.path.abspath(item.filepath)
+            item.size = os.path.getsize(item.filepath)
+        item.status = DONE
+        if self.index is not None and item.filepath:
+            self.index.add({
+                'path': item.filepath,
+                'id': item.video_id,
+                'extractor': info.get('extractor_key'),
+                'title': item.title,
+                'url': info.get('webpage_url'),
+                'source_url': item.url,
+                'size': item.size,
+                'duration': item.duration,
+                'format': info.get('format'),
+                'ext': info.get('ext'),
+                'audio_only': batch.audio_only,
+            })
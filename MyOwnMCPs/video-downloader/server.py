@@ -1,60 +1,197 @@
 from fastmcp import FastMCP
-import yt_dlp
+import asyncio
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ytdlp_common.extract_cache import ExtractCache, preload_ytdlp
+from ytdlp_common.throttle import Throttle
+import downloads
+from video_index import VideoIndex
 
 # Create the FastMCP server
 mcp = FastMCP("MyVideoDownloader")
 
+# Shared token bucket, per-host cap and 429 backoff for every yt-dlp call
+ytdlp_throttle = Throttle.from_env(cookies_dir=os.path.dirname(os.path.abspath(__file__)))
+
+# Playlist entries downloaded in parallel per call (further capped by YTDLP_MAX_PER_HOST)
+MAX_CONCURRENT = int(os.environ.get("VIDEO_MAX_CONCURRENT", 4))
+# Download batches running at once, and how many may wait behind them
+MAX_JOBS = int(os.environ.get("VIDEO_MAX_JOBS", 2))
+MAX_PENDING_JOBS = int(os.environ.get("VIDEO_MAX_PENDING_JOBS", 16))
+
+PAGE_SIZE = int(os.environ.get("VIDEO_PAGE_SIZE", 20))
+# video_index.db and the download archives; next to server.py by default
+STATE_DIR = os.environ.get("VIDEO_STATE_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+# yt-dlp is only imported by the first download, so tools/list is answered
+# without it. MCP_WARMUP=1 loads it on a background thread MCP_WARMUP_DELAY
+# seconds after start, once the client has finished the handshake
+WARMUP = os.environ.get("MCP_WARMUP") == "1"
+WARMUP_DELAY = float(os.environ.get("MCP_WARMUP_DELAY", 1.0))
+
+# Metadata of every downloaded file; videos downloaded before the index
+# existed are picked up from the folder on first start
+video_index = VideoIndex(os.path.join(STATE_DIR, "video_index.db"))
+video_index.import_folder("videos")
+video_index.prune()
+
+# Download archives live in STATE_DIR so re-runs skip videos already fetched
+downloader = downloads.BatchDownloader(
+    ytdlp_throttle, output_folder="videos", archive_dir=STATE_DIR,
+    index=video_index, info_cache=ExtractCache.from_env())
+batches = downloads.BatchRegistry()
+job_executor = ThreadPoolExecutor(max_workers=MAX_JOBS, thread_name_prefix='video-job')
+
+# Helper: register a batch and queue it on the job executor
+def submit_batch(url, audio_only, max_playlist_items, max_concurrent):
+    if batches.unfinished() >= MAX_JOBS + MAX_PENDING_JOBS:
+        raise RuntimeError(f"Too many downloads in progress ({MAX_JOBS + MAX_PENDING_JOBS}); try again later")
+    batch = downloads.Batch(url, audio_only, max_playlist_items)
+    batches.add(batch)
+    future = job_executor.submit(downloader.run, batch, max(1, min(max_concurrent, MAX_CONCURRENT)))
+    return batch, future
+
 @mcp.tool()
-def download_video(url: str, audio_only: bool = False, max_playlist_items: int = 5) -> str:
+async def download_video(url: str, audio_only: bool = False, max_playlist_items: int = 5, max_concurrent: int = 3) -> str:
     """Downloads a YouTube video given its URL.
     
     Args:
         url: The URL of the YouTube video to download.
         audio_only: Download only audio (mp3/m4a) instead of video. Defaults to False.
         max_playlist_items: If URL is a playlist, limit the number of videos to download. Defaults to 5.
-    """
-    output_folder = "videos"
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    
-    # Configure yt-dlp options
-    ydl_opts = {
-        'outtmpl': os.path.join(output_folder, '%(title)s.%(ext)s'),
-        'format': 'bestaudio/best' if audio_only else 'best',
-        'quiet': True,
-        'no_warnings': True,
-        'playlistend': max_playlist_items
-    }
+        max_concurrent: If URL is a playlist, how many videos to download at the same time. Defaults to 3.
     
+    Returns a JSON report with the size, time and throughput of each video.
+    Videos downloaded by an earlier call are skipped.
+    """
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            
-            if 'entries' in info:
-                # Playlist or multiple items
-                # entries is a lazy generator, but extract_info(download=True) typically exhausts it or returns a list if flat_playlist is not used
-                # We can't easily count without iterating, but extract_info returns a dict with 'entries' which might be a list
-                title = info.get('title', 'Playlist')
-                return f"Successfully processed playlist: {title} (limit: {max_playlist_items})"
-            else:
-                return f"Successfully downloaded: {info['title']}"
-    except Exception as e:
+        batch, future = submit_batch(url, audio_only, max_playlist_items, max_concurrent)
+    except RuntimeError as e:
         return f"Error downloading video: {str(e)}"
+    # Downloads block for minutes; wait for the job without blocking the event loop
+    await asyncio.wrap_future(future)
+    return json.dumps(batch.to_dict(), indent=2)
 
-@mcp.resource("videos://list")
-def list_videos() -> str:
-    """Lists all downloaded videos in the videos folder."""
-    output_folder = "videos"
-    if not os.path.exists(output_folder):
-        return "No videos have been downloaded yet."
+@mcp.tool()
+def start_download(url: str, audio_only: bool = False, max_playlist_items: int = 5, max_concurrent: int = 3) -> str:
+    """Starts downloading a YouTube video or playlist in the background and returns a job id at once.
+    
+    Takes the same arguments as download_video. Poll the job with download_status
+    and stop it with cancel_download.
+    """
+    try:
+        batch, _ = submit_batch(url, audio_only, max_playlist_items, max_concurrent)
+    except RuntimeError as e:
+        return f"Error starting download: {str(e)}"
+    return json.dumps({'job_id': batch.id, 'status': batch.status}, indent=2)
+
+@mcp.tool()
+def download_status(job_id: str) -> str:
+    """Returns the progress of a download job as JSON: bytes downloaded, speed (bytes/s) and ETA (s) for each video.
+    
+    Args:
+        job_id: The id returned by start_download.
+    """
+    batch = batches.get(job_id)
+    if batch is None:
+        return f"Unknown download job: {job_id}"
+    return json.dumps(batch.to_dict(), indent=2)
+
+@mcp.tool()
+def cancel_download(job_id: str) -> str:
+    """Cancels a download job. Videos already finished are kept; partial files are removed.
     
-    files = [f for f in os.listdir(output_folder) if os.path.isfile(os.path.join(output_folder, f))]
+    Args:
+        job_id: The id returned by start_download.
+    """
+    batch = batches.get(job_id)
+    if batch is None:
+        return f"Unknown download job: {job_id}"
+    if batch.finished_at:
+        return f"Download job {job_id} already finished ({batch.status})"
+    batch.cancel()
+    return f"Cancelling download job {job_id}"
+
+@mcp.tool()
+def list_downloaded_videos(query: str = "", ext: str = "", audio_only: Optional[bool] = None, limit: int = 20, offset: int = 0) -> str:
+    """Lists downloaded videos with their metadata, newest first, as JSON.
     
-    if not files:
-        return "No videos found."
-        
-    return "\n".join(files)
+    Args:
+        query: Only videos whose title contains this text (case-insensitive).
+        ext: Only files with this extension, e.g. "mp4" or "m4a".
+        audio_only: If set, only audio-only (true) or only video (false) downloads.
+        limit: Maximum number of videos to return. Defaults to 20.
+        offset: How many videos to skip, for fetching further pages. Defaults to 0.
+    """
+    filters = {'query': query or None, 'ext': ext or None, 'audio_only': audio_only}
+    videos = video_index.list(limit=max(limit, 0), offset=max(offset, 0), **filters)
+    total = video_index.count(**filters)
+    next_offset = offset + len(videos)
+    return json.dumps({
+        'total': total,
+        'videos': videos,
+        'next_offset': next_offset if next_offset < total else None,
+    }, indent=2)
+
+# Helper: one line per video for the videos:// resources
+def render_videos_page(page):
+    total = video_index.count()
+    if not total:
+        return "No videos have been downloaded yet."
+    pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    if page < 1 or page > pages:
+        return f"Page {page} does not exist ({pages} pages)."
+
+    lines = [f"Videos (page {page} of {pages}, {total} total):"]
+    for video in video_index.list(limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE):
+        size = f"{video['size'] / 1e6:.1f} MB" if video['size'] else "? MB"
+        duration = f"{int(video['duration']) // 60}:{int(video['duration']) % 60:02d}" if video['duration'] else "?:??"
+        lines.append(f"- {os.path.basename(video['path'])} | {video['title']} | {size} | {duration} | id: {video['id'] or '-'}")
+    if page < pages:
+        lines.append(f"Next page: videos://list/page/{page + 1}")
+    return "\n".join(lines)
+
+@mcp.resource("videos://list")
+def list_videos() -> str:
+    """Lists downloaded videos (newest first) with size, duration and id; first page."""
+    return render_videos_page(1)
+
+@mcp.resource("videos://list/page/{page}")
+def list_videos_page(page: str) -> str:
+    """Lists one page of downloaded videos."""
+    try:
+        return render_videos_page(int(page))
+    except ValueError:
+        return f"Invalid page: {page}"
+
+@mcp.resource("downloads://progress")
+def download_progress() -> str:
+    """Progress of running and recent download_video calls, as JSON."""
+    return json.dumps([batch.to_dict() for batch in batches.all()], indent=2)
+
+@mcp.resource("limiter://stats")
+def limiter_stats() -> str:
+    """Rate limiter state and retry counters for yt-dlp calls, as JSON."""
+    return json.dumps(ytdlp_throttle.metrics(), indent=2)
+
+# Helper: import the slow dependencies in the background after startup
+def start_warm_up():
+    def run():
+        time.sleep(WARMUP_DELAY)
+        try:
+            preload_ytdlp()
+        except Exception:
+            pass  # The first download will import it (and report any error)
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
 
 if __name__ == "__main__":
+    if WARMUP:
+        start_warm_up()
     mcp.run()
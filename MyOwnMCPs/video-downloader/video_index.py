@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    path TEXT PRIMARY KEY,
+    id TEXT,
+    extractor TEXT,
+    title TEXT NOT NULL,
+    url TEXT,
+    source_url TEXT,
+    size INTEGER,
+    duration REAL,
+    format TEXT,
+    ext TEXT,
+    audio_only INTEGER NOT NULL DEFAULT 0,
+    downloaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_id ON videos (id, audio_only);
+CREATE INDEX IF NOT EXISTS videos_source_url ON videos (source_url, audio_only);
+CREATE INDEX IF NOT EXISTS videos_downloaded_at ON videos (downloaded_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ('path', 'id', 'extractor', 'title', 'url', 'source_url', 'size',
+           'duration', 'format', 'ext', 'audio_only', 'downloaded_at')
+
+
+class VideoIndex:
+    """SQLite index of downloaded files and their metadata.
+
+    Rows are written when a download finishes, so listings and duplicate
+    checks read the index instead of stat-ing the videos folder.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly in _write()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def add(self, record):
+        """Insert or replace the row for record['path']"""
+        row = {column: record.get(column) for column in COLUMNS}
+        row['audio_only'] = int(bool(row['audio_only']))
+        row['downloaded_at'] = row['downloaded_at'] or time.time()
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO videos ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [row[column] for column in COLUMNS],
+            )
+
+    def find(self, video_id=None, extractor=None, source_url=None, audio_only=False):
+        """Return the newest indexed download whose file still exists, or None.
+
+        Looks the video up by id (and extractor, when given), then by the URL
+        it was downloaded from.
+        """
+        lookups = []
+        if video_id:
+            if extractor:
+                lookups.append(("id = ? AND extractor = ?", [video_id, extractor]))
+            else:
+                lookups.append(("id = ?", [video_id]))
+        if source_url:
+            lookups.append(("source_url = ?", [source_url]))
+        for where, params in lookups:
+            rows = self._conn().execute(
+                f"SELECT * FROM videos WHERE {where} AND audio_only = ? ORDER BY downloaded_at DESC",
+                params + [int(bool(audio_only))],
+            )
+            for row in rows:
+                if os.path.exists(row['path']):
+                    return dict(row)
+        return None
+
+    def _filter(self, query=None, ext=None, audio_only=None):
+        clauses, params = [], []
+        if query:
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if ext:
+            clauses.append("ext = ?")
+            params.append(ext.lstrip('.').lower())
+        if audio_only is not None:
+            clauses.append("audio_only = ?")
+            params.append(int(bool(audio_only)))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list(self, limit=20, offset=0, query=None, ext=None, audio_only=None):
+        """Newest first; query matches a substring of the title (case-insensitive)"""
+        where, params = self._filter(query, ext, audio_only)
+        rows = self._conn().execute(
+            f"SELECT * FROM videos{where} ORDER BY downloaded_at DESC, path LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, query=None, ext=None, audio_only=None):
+        where, params = self._filter(query, ext, audio_only)
+        return self._conn().execute(f"SELECT COUNT(*) FROM videos{where}", params).fetchone()[0]
+
+    def prune(self):
+        """Drop rows whose file was deleted from disk; returns how many"""
+        paths = [row[0] for row in self._conn().execute("SELECT path FROM videos")]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        if missing:
+            with self._write() as conn:
+                conn.executemany("DELETE FROM videos WHERE path = ?", missing)
+        return len(missing)
+
+    def import_folder(self, folder):
+        """Index files already in `folder` once per index (downloads made before it existed)"""
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'folder_imported'").fetchone():
+                return 0
+            count = 0
+            if os.path.isdir(folder):
+                for entry in os.scandir(folder):
+                    if not entry.is_file() or entry.name.endswith('.part'):
+                        continue
+                    title, ext = os.path.splitext(entry.name)
+                    stat = entry.stat()
+                    conn.execute(
+                        "INSERT OR IGNORE INTO videos (path, title, size, ext, downloaded_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (os.path.abspath(entry.path), title, stat.st_size, ext.lstrip('.').lower(), stat.st_mtime),
+                    )
+                    count += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('folder_imported', ?)", (str(count),))
+            return count
@@ -1,14 +1,62 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import yt_dlp
-import tempfile
+import hashlib
+import logging
+import math
 import os
 import re
-import io
+import sys
 from datetime import datetime
+from urllib.parse import urlencode
+from jobs import JobQueue, QueueFullError
+from metrics import init_app as init_metrics, metrics, phase, record_error, timed_chunks
+from subtitle_cache import SubtitleCache
+from subtitle_parser import parse_transcript
+from subtitle_writer import FORMATS, iter_encoded_chunks, iter_entry_times
+from transcript_store import Transcript, TranscriptStore
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ytdlp_common.extract_cache import ExtractCache, YoutubeDLPool
+from ytdlp_common.throttle import Throttle
 
 app = Flask(__name__, static_folder='static', static_url_path='')
+# Browsers may reuse static assets for this long (and revalidate by ETag after)
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = int(os.environ.get('STATIC_MAX_AGE', 3600))
 CORS(app)
+# Per-phase timings and counters for /metrics, plus one JSON log line per request
+init_metrics(app)
+metrics.enabled = os.environ.get('METRICS', '1') != '0'
+if os.environ.get('REQUEST_LOG', '1') != '0':
+    request_log = logging.getLogger('subtitles.requests')
+    if not request_log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        request_log.addHandler(handler)
+        request_log.setLevel(logging.INFO)
+        request_log.propagate = False
+
+# Parsed transcripts are cached by (video_id, lang) so repeat requests skip yt-dlp
+CACHE_DIR = os.environ.get('SUBTITLE_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache'))
+DEFAULT_LANG_KEY = 'default'
+SUBTITLE_EXTS = ('srt', 'vtt')
+subtitle_cache = SubtitleCache(
+    CACHE_DIR,
+    max_entries=int(os.environ.get('SUBTITLE_CACHE_ENTRIES', 256)),
+    ttl=int(os.environ.get('SUBTITLE_CACHE_TTL', 24 * 3600)),
+)
+
+# Compact, queryable copies of recently used transcripts, loaded from the
+# cache above, so clients can ask for a time window or keyword matches
+transcript_store = TranscriptStore(max_bytes=int(os.environ.get('TRANSCRIPT_STORE_MB', 256)) * 1024 * 1024)
+MAX_QUERY_CUES = 5000
+
+# Every yt-dlp call goes through one token bucket shared by all request threads
+ytdlp_throttle = Throttle.from_env(cookies_dir=os.path.dirname(os.path.abspath(__file__)))
+
+# extract_info results shared with the other yt-dlp tools, and one reusable
+# YoutubeDL per request thread
+info_cache = ExtractCache.from_env()
+ydl_pool = YoutubeDLPool()
 
 def extract_video_id(url):
     """Extract YouTube video ID from URL"""
@@ -24,33 +72,172 @@ def extract_video_id(url):
             return match.group(1)
     return None
 
-def format_time(seconds):
-    """Convert seconds to SRT time format"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
-def create_srt(transcript):
-    """Convert transcript to SRT format"""
-    srt_content = []
-    for i, entry in enumerate(transcript, 1):
-        start_time = format_time(entry['start'])
-        end_time = format_time(entry['start'] + entry['duration'])
-        text = entry['text']
-        
-        srt_content.append(f"{i}")
-        srt_content.append(f"{start_time} --> {end_time}")
-        srt_content.append(text)
-        srt_content.append("")
-    
-    return "\n".join(srt_content)
+# Assets linked from index.html, which get a content hash in their URL
+STATIC_ASSETS = ('style.css', 'script.js')
+_index_cache = {}
+
+# Helper: index.html with ?v=<hash> on each asset URL, rebuilt when a file
+# changes, so a deploy's new script.js/style.css bypass STATIC_MAX_AGE
+def versioned_index():
+    paths = [os.path.join(app.static_folder, name) for name in ('index.html',) + STATIC_ASSETS]
+    stamp = tuple(os.stat(path).st_mtime_ns for path in paths)
+    cached = _index_cache.get('page')
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(paths[0], 'r', encoding='utf-8') as f:
+        html = f.read()
+    for name, path in zip(STATIC_ASSETS, paths[1:]):
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        html = html.replace(f'"{name}"', f'"{name}?v={digest}"')
+    _index_cache['page'] = (stamp, html)
+    return html
 
 @app.route('/')
 def index():
     """Serve the main page"""
-    return app.send_static_file('index.html')
+    # Always revalidated by ETag, so new asset versions are picked up at once
+    response = Response(versioned_index(), mimetype='text/html')
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+class SubtitleError(Exception):
+    """Subtitle extraction failure carrying the HTTP status to report"""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+def extract_transcript(url, requested_lang=None):
+    """Resolve a subtitle track with yt-dlp and parse it into a transcript list.
+
+    Returns (transcript, subtitle_lang). This is the default
+    app.config['SUBTITLE_EXTRACTOR']; a fake with the same signature can be
+    configured to run the app without network access.
+    """
+    # yt-dlp options for extracting subtitles only
+    # Allow user to request a specific subtitle language
+    subtitle_langs = ['en', 'en-US', 'en-GB', 'all']
+    if requested_lang:
+        subtitle_langs = [requested_lang]
+
+    def run(cookiefile):
+        ydl_opts = {
+            'skip_download': True,
+            'quiet': True,
+            'socket_timeout': 30,
+        }
+        # Cookies come from the throttle's pool of cookies*.txt files, if any
+        if cookiefile:
+            ydl_opts['cookiefile'] = cookiefile
+        ydl = ydl_pool.get(ydl_opts)
+        with phase('extract_info'):
+            info = info_cache.extract(ydl, url)
+        # Find available subtitles
+        subs = info.get('subtitles') or {}
+        auto_subs = info.get('automatic_captions') or {}
+        # Use requested language if available
+        subtitle_lang = None
+        if requested_lang:
+            if requested_lang in subs:
+                subtitle_lang = requested_lang
+            elif requested_lang in auto_subs:
+                subtitle_lang = requested_lang
+        if not subtitle_lang:
+            # Fallback to any available
+            for lang in subtitle_langs:
+                if lang in subs:
+                    subtitle_lang = lang
+                    break
+                elif lang in auto_subs:
+                    subtitle_lang = lang
+                    break
+        if not subtitle_lang:
+            raise SubtitleError('No subtitles found for this video', 404)
+
+        # Fetch the chosen track straight from the URL in the extracted info,
+        # instead of resolving the video a second time with ydl.download()
+        track = (pick_subtitle_track(subs.get(subtitle_lang))
+                 or pick_subtitle_track(auto_subs.get(subtitle_lang)))
+        if not track:
+            raise SubtitleError('No SRT or VTT subtitle track available', 404)
+        fetch_track = app.config['SUBTITLE_HTTP_GET']
+        with phase('fetch'):
+            raw = fetch_track(track['url'], ydl)
+        # SRT and VTT are both parsed natively, cue by cue
+        with phase('parse'):
+            transcript = parse_transcript(raw)
+        return transcript, subtitle_lang
+
+    # Rate limited, with backoff and cookie rotation when YouTube answers 429
+    transcript, subtitle_lang = ytdlp_throttle.call(url, run)
+
+    if not transcript:
+        raise SubtitleError('No subtitles found for this video', 404)
+    return transcript, subtitle_lang
+
+def get_transcript(url, video_id, requested_lang=None):
+    """Return the subtitles payload for a video, from the cache when possible"""
+    cache_lang = requested_lang or DEFAULT_LANG_KEY
+    with phase('cache'):
+        cached = subtitle_cache.get(video_id, cache_lang)
+    if cached:
+        return {
+            'success': True,
+            'video_id': video_id,
+            'subtitles': cached['subtitles'],
+            'lang': cached['lang'],
+            'cached': True,
+        }
+
+    extract = app.config['SUBTITLE_EXTRACTOR']
+    transcript, subtitle_lang = extract(url, requested_lang)
+
+    subtitle_cache.set(video_id, subtitle_lang, transcript)
+    if cache_lang != subtitle_lang:
+        subtitle_cache.set(video_id, cache_lang, transcript, resolved_lang=subtitle_lang)
+
+    return {
+        'success': True,
+        'video_id': video_id,
+        'subtitles': transcript,
+        'lang': subtitle_lang,
+        'cached': False,
+        'note': 'If you get a 429 error, try providing fresh cookies.txt from a browser session where you loaded the desired subtitles.'
+    }
+
+def load_transcript(video_id, lang=None):
+    """Return the stored Transcript for a video, loading or extracting it if needed"""
+    key = (video_id, lang or DEFAULT_LANG_KEY)
+    transcript = transcript_store.get(key)
+    if transcript is None:
+        payload = get_transcript(f'https://www.youtube.com/watch?v={video_id}', video_id, lang)
+        transcript = Transcript.from_entries(payload['subtitles'], lang=payload['lang'])
+        transcript_store.put(key, transcript)
+    return transcript
+
+# Helper: Convert a time in seconds to integer milliseconds, None if absent.
+# Raises ValueError for anything but a finite number
+def parse_seconds(value):
+    if value in (None, ''):
+        return None
+    try:
+        seconds = float(value)
+    except TypeError:
+        raise ValueError(f'{value!r} is not a number')
+    if not math.isfinite(seconds):
+        raise ValueError(f'{value!r} is not a finite number')
+    return round(seconds * 1000)
+
+# Helper: Read start/end (seconds) and q from a dict of request parameters.
+# Raises ValueError for malformed values
+def parse_selection(params):
+    start_ms = parse_seconds(params.get('start'))
+    end_ms = parse_seconds(params.get('end'))
+    if start_ms is not None and end_ms is not None and end_ms <= start_ms:
+        raise ValueError('end must be greater than start')
+    return start_ms, end_ms, params.get('q') or None
 
 @app.route('/api/subtitles', methods=['POST'])
 def get_subtitles():
@@ -60,169 +247,275 @@ def get_subtitles():
         url = data.get('url', '')
         if not url:
             return jsonify({'error': 'URL is required'}), 400
-        video_id = extract_video_id(url)
+        with phase('parse_url'):
+            video_id = extract_video_id(url)
         if not video_id:
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
-        # yt-dlp options for extracting subtitles only
-        # Allow user to request a specific subtitle language
-        requested_lang = data.get('lang', None)
-        subtitle_langs = ['en', 'en-US', 'en-GB', 'all']
-        if requested_lang:
-            subtitle_langs = [requested_lang]
+        lang = data.get('lang', None)
+        if data.get('summary'):
+            # Keep the transcript server-side; query it via /api/transcripts
+            transcript = load_transcript(video_id, lang)
+            with phase('serialize'):
+                return jsonify({
+                    'success': True,
+                    'video_id': video_id,
+                    'lang': transcript.lang,
+                    'cues': len(transcript),
+                    'duration': transcript.duration,
+                    'transcript_url': f'/api/transcripts/{video_id}' + (f'?{urlencode({"lang": lang})}' if lang else ''),
+                })
 
-        ydl_opts = {
-            'skip_download': True,
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitlesformat': 'srt',
-            'subtitleslangs': subtitle_langs,
-            'quiet': True,
-            'outtmpl': {'default': '%(id)s.%(ext)s'},
-            'sleep_subtitles': 60,  # Wait before downloading auto subs to avoid 429
-        }
-        # Use cookies.txt for authentication if available
-        cookies_path = os.path.join(os.path.dirname(__file__), 'cookies.txt')
-        if os.path.exists(cookies_path):
-            ydl_opts['cookiefile'] = cookies_path
-        # Use cookies.txt for authentication if available
-        cookies_path = os.path.join(os.path.dirname(__file__), 'cookies.txt')
-        if os.path.exists(cookies_path):
-            ydl_opts['cookiefile'] = cookies_path
-        transcript = None
-        srt_path = None
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            # Find available subtitles
-            subs = info.get('subtitles') or {}
-            auto_subs = info.get('automatic_captions') or {}
-            # Use requested language if available
-            subtitle_lang = None
-            if requested_lang:
-                if requested_lang in subs:
-                    subtitle_lang = requested_lang
-                elif requested_lang in auto_subs:
-                    subtitle_lang = requested_lang
-            if not subtitle_lang:
-                # Fallback to any available
-                for lang in subtitle_langs:
-                    if lang in subs:
-                        subtitle_lang = lang
-                        break
-                    elif lang in auto_subs:
-                        subtitle_lang = lang
-                        break
-            if not subtitle_lang:
-                return jsonify({'error': 'No subtitles found for this video'}), 404
-
-            # Download the subtitle file to a temp directory
-            with tempfile.TemporaryDirectory() as tmpdir:
-                ydl_opts_dl = ydl_opts.copy()
-                ydl_opts_dl['outtmpl'] = {'default': os.path.join(tmpdir, '%(id)s.%(ext)s')}
-                ydl_opts_dl['subtitleslangs'] = [subtitle_lang]
-                with yt_dlp.YoutubeDL(ydl_opts_dl) as ydl_dl:
-                    ydl_dl.download([url])
-                # Find the SRT file
-                for ext in ['srt', 'vtt']:
-                    candidate = os.path.join(tmpdir, f'{video_id}.{ext}')
-                    if os.path.exists(candidate):
-                        srt_path = candidate
-                        break
-                if not srt_path:
-                    return jsonify({'error': 'Failed to download subtitles'}), 500
-                # If VTT, convert to SRT
-                if srt_path.endswith('.vtt'):
-                    with open(srt_path, 'r', encoding='utf-8') as f:
-                        vtt_data = f.read()
-                    srt_data = vtt_to_srt(vtt_data)
-                else:
-                    with open(srt_path, 'r', encoding='utf-8') as f:
-                        srt_data = f.read()
-                # Parse SRT to transcript list
-                transcript = parse_srt_to_transcript(srt_data)
-
-        if not transcript:
-            return jsonify({'error': 'No subtitles found for this video'}), 404
-
-        return jsonify({
-            'success': True,
-            'video_id': video_id,
-            'subtitles': transcript,
-            'lang': subtitle_lang,
-            'note': 'If you get a 429 error, try providing fresh cookies.txt from a browser session where you loaded the desired subtitles.'
-        })
+        payload = get_transcript(url, video_id, lang)
+        with phase('serialize'):
+            return jsonify(payload)
+    except SubtitleError as e:
+        record_error('subtitles', e)
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
+        record_error('subtitles', e)
         return jsonify({'error': str(e)}), 500
 
-# Helper: Convert VTT to SRT
-def vtt_to_srt(vtt_data):
-    srt = []
-    counter = 1
-    for line in vtt_data.splitlines():
-        if '-->' in line:
-            line = line.replace('.', ',')
-            srt.append(str(counter))
-            counter += 1
-        srt.append(line)
-    return '\n'.join(srt)
-
-# Helper: Parse SRT to transcript list
-def parse_srt_to_transcript(srt_data):
-    transcript = []
-    entries = srt_data.strip().split('\n\n')
-    for entry in entries:
-        lines = entry.strip().split('\n')
-        if len(lines) >= 3:
-            # SRT: idx, time, text
-            time_line = lines[1]
-            text = ' '.join(lines[2:])
-            start_str, end_str = time_line.split(' --> ')
-            start = srt_time_to_seconds(start_str)
-            end = srt_time_to_seconds(end_str)
-            transcript.append({
-                'start': start,
-                'duration': end - start,
-                'text': text
-            })
-    return transcript
+def run_subtitle_job(url, video_id, lang):
+    """Worker for the background job queue"""
+    return get_transcript(url, video_id, lang)
+
+# Background extraction jobs, so slow videos don't hold request threads
+job_queue = JobQueue(
+    run_subtitle_job,
+    max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+    max_pending=int(os.environ.get('JOB_QUEUE_SIZE', 64)),
+    timeout=int(os.environ.get('JOB_TIMEOUT', 120)),
+)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_jobs():
+    """Queue subtitle extraction for one URL ('url') or many ('urls')"""
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls') or ([data['url']] if data.get('url') else [])
+    if not urls or not isinstance(urls, list):
+        return jsonify({'error': 'url or urls is required'}), 400
+    lang = data.get('lang', None)
+
+    items = []
+    with phase('parse_url'):
+        for url in urls:
+            video_id = extract_video_id(url) if isinstance(url, str) else None
+            if not video_id:
+                return jsonify({'error': f'Invalid YouTube URL: {url}'}), 400
+            items.append((url, video_id, lang))
+
+    try:
+        jobs = job_queue.submit_many(items)
+    except QueueFullError as e:
+        record_error('jobs', e)
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    return jsonify({
+        'jobs': [dict(job.to_dict(), status_url=f'/api/jobs/{job.id}') for job in jobs]
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll the status (and result, once done) of an extraction job"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/transcripts/<video_id>', methods=['GET'])
+def query_transcript(video_id):
+    """Cues of a video within a time window (start/end, seconds) and/or containing
+    every word of q, paginated with limit/offset"""
+    try:
+        if extract_video_id(video_id) != video_id:
+            return jsonify({'error': 'Invalid video ID'}), 400
+        try:
+            start_ms, end_ms, query = parse_selection(request.args)
+            limit = max(1, min(int(request.args.get('limit', 500)), MAX_QUERY_CUES))
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid query: {e}'}), 400
+
+        transcript = load_transcript(video_id, request.args.get('lang'))
+        with phase('query'):
+            indices = transcript.select(start_ms, end_ms, query)
+        page = indices[offset:offset + limit]
+        with phase('serialize'):
+            data = {
+                'success': True,
+                'video_id': video_id,
+                'lang': transcript.lang,
+                'cues': len(transcript),
+                'matches': len(indices),
+                'offset': offset,
+                'subtitles': transcript.entries(page),
+            }
+            if offset + limit < len(indices):
+                data['next_offset'] = offset + limit
+            return jsonify(data)
+    except SubtitleError as e:
+        record_error('transcripts', e)
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        record_error('transcripts', e)
+        return jsonify({'error': str(e)}), 500
 
-# Helper: SRT time to seconds
-def srt_time_to_seconds(timestr):
-    h, m, s_ms = timestr.split(':')
-    s, ms = s_ms.split(',')
-    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
+# Helper: Pick the first SRT or VTT entry of a subtitle track list
+def pick_subtitle_track(tracks):
+    for ext in SUBTITLE_EXTS:
+        for track in tracks or []:
+            if track.get('ext') == ext and track.get('url'):
+                return track
+    return None
+
+# Helper: Download a subtitle track into memory through yt-dlp's opener,
+# which carries the same cookies, headers and proxy as extract_info
+def fetch_subtitle_track(track_url, ydl):
+    with ydl.urlopen(track_url) as response:
+        return response.read()
+
+# Helper: Convert posted transcript dicts to (start_ms, end_ms, text) cues up
+# front, so bad input gets a 400 instead of a truncated streamed file.
+# Raises ValueError for malformed entries
+def parse_posted_cues(transcript):
+    if not isinstance(transcript, list):
+        raise ValueError('subtitles must be a list')
+    try:
+        return list(iter_entry_times(transcript))
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f'malformed subtitle entry ({type(e).__name__}: {e})')
 
 @app.route('/api/download', methods=['POST'])
 def download_subtitles():
-    """Download subtitles as SRT file"""
+    """Download subtitles as an SRT, WebVTT, plain text or JSON Lines file.
+
+    The cues are either posted in 'subtitles' or taken from the server-side
+    transcript of 'video_id' (optionally narrowed by lang, start, end and q).
+    """
     try:
         data = request.get_json()
         transcript = data.get('subtitles', [])
         video_id = data.get('video_id', 'subtitles')
+        fmt = (data.get('format') or request.args.get('format') or 'srt').lower()
         
-        if not transcript:
+        if fmt not in FORMATS:
+            return jsonify({'error': f"Unsupported format '{fmt}', use one of: {', '.join(FORMATS)}"}), 400
+        writer, mimetype, ext = FORMATS[fmt]
+        if transcript:
+            try:
+                cues = parse_posted_cues(transcript)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid subtitles: {e}'}), 400
+        elif data.get('video_id'):
+            if extract_video_id(str(video_id)) != video_id:
+                return jsonify({'error': 'Invalid video ID'}), 400
+            try:
+                start_ms, end_ms, query = parse_selection(data)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid query: {e}'}), 400
+            stored = load_transcript(video_id, data.get('lang'))
+            cues = stored.iter_cues(stored.select(start_ms, end_ms, query)
+                                    if start_ms is not None or end_ms is not None or query else None)
+        else:
             return jsonify({'error': 'No subtitles provided'}), 400
         
-        # Create SRT content
-        srt_content = create_srt(transcript)
-        
-        # Create file in memory
-        file_stream = io.BytesIO(srt_content.encode('utf-8'))
-        file_stream.seek(0)
-        
         # Generate filename
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{video_id}_{timestamp}.srt"
+        safe_id = re.sub(r'[^0-9A-Za-z_-]', '_', str(video_id))
+        filename = f"{safe_id}_{timestamp}.{ext}"
         
-        return send_file(
-            file_stream,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='text/plain'
+        # Stream the file cue by cue instead of building it in memory
+        chunks = timed_chunks(iter_encoded_chunks(writer(cues)))
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
+    except SubtitleError as e:
+        record_error('download', e)
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
+        record_error('download', e)
         return jsonify({'error': str(e)}), 500
 
+def is_admin_request():
+    """Check the admin token; without ADMIN_TOKEN only local requests are allowed"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if token:
+        return request.headers.get('X-Admin-Token') == token
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Return subtitle cache hit/miss counters"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(subtitle_cache.get_stats())
+
+@app.route('/api/limiter', methods=['GET'])
+def limiter_stats():
+    """Return yt-dlp rate limiter state and retry counters"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(ytdlp_throttle.metrics())
+
+@app.route('/api/cache', methods=['DELETE'])
+def purge_cache():
+    """Purge cached subtitles, optionally only for one video_id (and lang)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    data = request.get_json(silent=True) or {}
+    video_id = data.get('video_id') or request.args.get('video_id')
+    lang = data.get('lang') or request.args.get('lang')
+    if lang and not video_id:
+        return jsonify({'error': 'lang requires video_id'}), 400
+    removed = subtitle_cache.purge(video_id, lang)
+    # The queryable copies would otherwise keep serving purged transcripts
+    transcript_store.purge(video_id, lang)
+    return jsonify({'success': True, 'removed': removed})
+
+# Helper: counters owned by the caches, limiter and job queue, read at scrape time
+def collect_component_metrics():
+    samples = []
+    for event, value in subtitle_cache.get_stats().items():
+        if event in ('memory_hits', 'disk_hits', 'misses', 'stores'):
+            samples.append(('subtitle_cache_events_total', 'counter',
+                            'Transcript cache lookups and stores', value, {'event': event}))
+    for event, value in transcript_store.get_stats().items():
+        if event in ('hits', 'misses', 'stores', 'evictions'):
+            samples.append(('transcript_store_events_total', 'counter',
+                            'Compact transcript store lookups, stores and evictions', value, {'event': event}))
+        elif event == 'bytes':
+            samples.append(('transcript_store_bytes', 'gauge',
+                            'Approximate memory held by the transcript store', value, {}))
+    for event, value in info_cache.stats.items():
+        samples.append(('ytdlp_info_cache_events_total', 'counter',
+                        'yt-dlp extract_info cache events', value, {'event': event}))
+    limiter = ytdlp_throttle.metrics()
+    for name in ('calls', 'succeeded', 'failed', 'retries', 'http_429', 'http_5xx', 'cookie_rotations'):
+        samples.append((f'ytdlp_{name}_total', 'counter', f'yt-dlp limiter counter: {name}', limiter[name], {}))
+    for name in ('limiter_wait_seconds', 'backoff_seconds'):
+        samples.append((f'ytdlp_{name}_total', 'counter', f'Seconds spent in {name.replace("_seconds", "")}',
+                        round(limiter[name], 6), {}))
+    for state, value in job_queue.stats().items():
+        if state != 'capacity':
+            samples.append(('subtitle_jobs', 'gauge', 'Background jobs by state', value, {'state': state}))
+    return samples
+
+metrics.add_collector(collect_component_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text exposition of request, phase, cache and limiter metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# The HTTP layer used for subtitle tracks can be swapped (e.g. for a local stub server)
+app.config.setdefault('SUBTITLE_HTTP_GET', fetch_subtitle_track)
+app.config.setdefault('SUBTITLE_EXTRACTOR', extract_transcript)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,41 @@
+"""Micro-benchmark of the old float format_time against the integer-millisecond formatter.
+
+Usage: python benchmarks/bench_format_time.py [--n 200000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from subtitle_writer import format_timestamp
+
+
+# Previous helper from app.py, kept here as the baseline
+def legacy_format_time(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    millis = int((seconds % 1) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=200000)
+    args = parser.parse_args()
+
+    seconds = [i * 1.237 for i in range(args.n)]
+    millis = [round(s * 1000) for s in seconds]
+    mismatches = sum(legacy_format_time(s) != format_timestamp(ms) for s, ms in zip(seconds, millis))
+
+    legacy = min(timeit.repeat(lambda: [legacy_format_time(s) for s in seconds], number=1, repeat=5))
+    integer = min(timeit.repeat(lambda: [format_timestamp(ms) for ms in millis], number=1, repeat=5))
+    print(f'{args.n} timestamps')
+    print(f'  format_time (float)   {legacy / args.n * 1e9:7.0f} ns/call')
+    print(f'  format_timestamp (ms) {integer / args.n * 1e9:7.0f} ns/call  ({legacy / integer:.2f}x)')
+    # The float version truncates, so values like 1.237 s can come out as 1,236
+    print(f'  outputs differing from the float version (rounding): {mismatches}')
+
+if __name__ == '__main__':
+    main()
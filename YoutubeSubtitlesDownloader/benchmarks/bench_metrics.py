@@ -0,0 +1,99 @@
+"""Overhead of the request instrumentation (metrics.py) on the Flask endpoints.
+
+Runs requests through the Flask test client, switching metrics on and off
+on every other request so machine noise and cache growth hit both alike,
+and compares the median latency of each. The extractor is replaced by an
+in-process fake that parses a synthetic SRT file, so no network is used.
+
+Usage: python benchmarks/bench_metrics.py [--requests 1000] [--cues 1000]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The app reads its cache locations at import time; removed again when main() returns
+_tmp = tempfile.TemporaryDirectory(prefix='bench_metrics_')
+os.environ.setdefault('SUBTITLE_CACHE_DIR', os.path.join(_tmp.name, 'subtitles'))
+os.environ.setdefault('YTDLP_INFO_CACHE_DIR', os.path.join(_tmp.name, 'info'))
+os.environ.setdefault('SUBTITLE_CACHE_ENTRIES', '100000')
+
+import app as subtitle_app
+from metrics import metrics
+from subtitle_parser import parse_transcript
+from subtitle_writer import format_timestamp
+
+
+def make_srt(cues):
+    blocks = []
+    for i in range(cues):
+        start = i * 2500
+        blocks.append(f"{i + 1}\n{format_timestamp(start)} --> {format_timestamp(start + 2000)}\n"
+                      f"Subtitle line number {i} with a few words\n")
+    return '\n'.join(blocks).encode('utf-8')
+
+
+def video_url(n):
+    # 11-character ids, distinct per request so uncached requests really miss
+    return f'https://www.youtube.com/watch?v={n:011d}'
+
+
+def timed_request(client, workload, n, transcript):
+    started = time.perf_counter()
+    if workload == 'uncached':
+        response = client.post('/api/subtitles', json={'url': video_url(n)})
+    elif workload == 'cached':
+        response = client.post('/api/subtitles', json={'url': video_url(0)})
+    else:
+        response = client.post('/api/download', json={'subtitles': transcript, 'format': 'srt'})
+    response.get_data()
+    # Real WSGI servers close the response; that is when the request is logged
+    response.close()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--cues', type=int, default=1000)
+    args = parser.parse_args()
+
+    raw = make_srt(args.cues)
+    subtitle_app.app.config['SUBTITLE_EXTRACTOR'] = lambda url, lang: (parse_transcript(raw), 'en')
+    # Log lines are formatted and written, just not to the terminal
+    devnull = open(os.devnull, 'w')
+    request_log = logging.getLogger('subtitles.requests')
+    request_log.handlers = [logging.StreamHandler(devnull)]
+    request_log.setLevel(logging.INFO)
+    request_log.propagate = False
+
+    client = subtitle_app.app.test_client()
+    client.post('/api/subtitles', json={'url': video_url(0)}).close()
+    transcript = parse_transcript(raw)
+
+    print(f'{args.requests} requests per workload, {args.cues} cues per transcript')
+    n = 1
+    for workload in ('uncached', 'cached', 'download'):
+        samples = {True: [], False: []}
+        for i in range(args.requests):
+            enabled = i % 2 == 1
+            metrics.enabled = enabled
+            samples[enabled].append(timed_request(client, workload, n, transcript))
+            n += 1
+        off = statistics.median(samples[False])
+        on = statistics.median(samples[True])
+        print(f'  {workload:<9} off {off * 1e6:8.1f} us/req   on {on * 1e6:8.1f} us/req   '
+              f'overhead {(on - off) * 1e6:6.1f} us ({(on - off) / off * 100:+.2f}%)')
+    metrics.enabled = True
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        _tmp.cleanup()
@@ -0,0 +1,113 @@
+"""Compare the streaming subtitle parser with the old vtt_to_srt + parse_srt_to_transcript path.
+
+Usage: python benchmarks/bench_parser.py [--cues 200000] [--repeat 3]
+"""
+import argparse
+import collections
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from subtitle_parser import iter_cues, parse_transcript
+
+
+# Previous helpers from app.py, kept here as the baseline
+def legacy_vtt_to_srt(vtt_data):
+    srt = []
+    counter = 1
+    for line in vtt_data.splitlines():
+        if '-->' in line:
+            line = line.replace('.', ',')
+            srt.append(str(counter))
+            counter += 1
+        srt.append(line)
+    return '\n'.join(srt)
+
+def legacy_parse_srt_to_transcript(srt_data):
+    transcript = []
+    entries = srt_data.strip().split('\n\n')
+    for entry in entries:
+        lines = entry.strip().split('\n')
+        if len(lines) >= 3:
+            time_line = lines[1]
+            text = ' '.join(lines[2:])
+            start_str, end_str = time_line.split(' --> ')
+            start = legacy_srt_time_to_seconds(start_str)
+            end = legacy_srt_time_to_seconds(end_str)
+            transcript.append({
+                'start': start,
+                'duration': end - start,
+                'text': text
+            })
+    return transcript
+
+def legacy_srt_time_to_seconds(timestr):
+    h, m, s_ms = timestr.split(':')
+    s, ms = s_ms.split(',')
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
+
+def legacy_parse(raw, ext):
+    data = raw.decode('utf-8')
+    if ext == 'vtt':
+        data = legacy_vtt_to_srt(data)
+    return legacy_parse_srt_to_transcript(data)
+
+
+def vtt_timestamp(ms):
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f'{h:02d}:{m:02d}:{s:02d}.{ms:03d}'
+
+def make_track(cues, ext):
+    """Build a synthetic track with two-second cues (VTT without cue ids, like YouTube)"""
+    out = ['WEBVTT', ''] if ext == 'vtt' else []
+    for i in range(cues):
+        start = vtt_timestamp(i * 2000)
+        end = vtt_timestamp(i * 2000 + 1900)
+        if ext == 'srt':
+            start, end = start.replace('.', ','), end.replace('.', ',')
+        if ext == 'srt':
+            out.append(str(i + 1))
+        out.append(f'{start} --> {end}')
+        out.append(f'caption number {i} with a few more words')
+        out.append('')
+    return '\n'.join(out).encode('utf-8')
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cues', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for ext in ('srt', 'vtt'):
+        raw = make_track(args.cues, ext)
+        assert len(parse_transcript(raw)) == len(legacy_parse(raw, ext)) == args.cues
+        print(f'{ext.upper()} track: {args.cues} cues, {len(raw) / 1e6:.1f} MB')
+        for name, fn in (
+            ('legacy', lambda: legacy_parse(raw, ext)),
+            ('streaming', lambda: parse_transcript(io.BytesIO(raw))),
+            # Cues consumed one at a time, as a streamed response would
+            ('iter_cues', lambda: collections.deque(iter_cues(io.BytesIO(raw)), maxlen=0)),
+        ):
+            seconds, peak = measure(fn, args.repeat)
+            print(f'  {name:<10} {seconds * 1000:9.1f} ms  peak {peak / 1e6:7.1f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Requests/sec of the subtitle app on the debug server versus serve.py.
+
+Starts the app in a subprocess, once as `python app.py` runs it (Flask's
+debug server) and once through serve.py (gunicorn, or waitress where
+gunicorn is missing), with the extractor replaced by a stub that waits
+--extract-ms (standing in for YouTube) and parses a synthetic SRT file.
+Client threads on keep-alive connections then send a mix of uncached and
+cached subtitle requests and static file fetches for --seconds.
+
+Usage: python benchmarks/bench_serving.py [--concurrency 16] [--seconds 10] [--extract-ms 50]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def make_srt(cues):
+    from subtitle_writer import format_timestamp
+    blocks = []
+    for i in range(cues):
+        start = i * 2500
+        blocks.append(f"{i + 1}\n{format_timestamp(start)} --> {format_timestamp(start + 2000)}\n"
+                      f"Subtitle line number {i} with a few words\n")
+    return '\n'.join(blocks).encode('utf-8')
+
+
+def run_server(mode, port, extract_ms, cues):
+    """Subprocess side: patch in the stub extractor, then serve"""
+    sys.path.insert(0, APP_DIR)
+    import app as subtitle_app
+    from subtitle_parser import parse_transcript
+
+    raw = make_srt(cues)
+
+    def stub_extractor(url, lang):
+        time.sleep(extract_ms / 1000)
+        return parse_transcript(raw), 'en'
+
+    subtitle_app.app.config['SUBTITLE_EXTRACTOR'] = stub_extractor
+    if mode == 'debug':
+        # What `python app.py` runs, minus the reloader's file watcher process
+        subtitle_app.app.run(host='127.0.0.1', port=port, debug=True, use_reloader=False)
+    else:
+        import serve
+        serve.serve('app:app', bind=f'127.0.0.1:{port}')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def client(port, worker, deadline, latencies, errors, counter):
+    conn = None
+    n = 0
+    while time.monotonic() < deadline:
+        # 4 in 10 requests miss the cache, 4 hit it, 2 fetch a static file
+        slot = n % 10
+        if slot < 4:
+            with counter['lock']:
+                counter['next'] += 1
+                video = counter['next']
+            method, path, body = 'POST', '/api/subtitles', {'url': f'https://youtu.be/{video:011d}'}
+        elif slot < 8:
+            method, path, body = 'POST', '/api/subtitles', {'url': f'https://youtu.be/{worker:011d}'}
+        else:
+            method, path, body = 'GET', '/script.js', None
+        n += 1
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            payload = json.dumps(body) if body is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            if response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            if conn is not None:
+                conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - started)
+    if conn is not None:
+        conn.close()
+
+
+def load_test(mode, args):
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix='bench_serving_') as cache_dir:
+        return run_load_test(mode, args, port, cache_dir)
+
+
+def run_load_test(mode, args, port, cache_dir):
+    env = dict(os.environ,
+               SUBTITLE_CACHE_DIR=os.path.join(cache_dir, 'subtitles'),
+               YTDLP_INFO_CACHE_DIR=os.path.join(cache_dir, 'info'),
+               REQUEST_LOG='0', WEB_LOG_LEVEL='warning')
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port),
+         '--extract-ms', str(args.extract_ms), '--cues', str(args.cues)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        latencies, errors = [], []
+        counter = {'next': 10 ** 6, 'lock': threading.Lock()}
+        deadline = time.monotonic() + args.seconds
+        threads = [threading.Thread(target=client, args=(port, i, deadline, latencies, errors, counter))
+                   for i in range(args.concurrency)]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--extract-ms', type=float, default=50)
+    parser.add_argument('--cues', type=int, default=300)
+    parser.add_argument('--serve', choices=('debug', 'production'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        run_server(args.serve, args.port, args.extract_ms, args.cues)
+        return
+
+    print(f'{args.concurrency} clients for {args.seconds:g}s, stub extraction {args.extract_ms:g} ms, '
+          f'{args.cues} cues per transcript')
+    results = {}
+    for mode in ('debug', 'production'):
+        results[mode] = r = load_test(mode, args)
+        print(f'  {mode:<10} {r["rps"]:8.1f} req/s   p50 {r["p50_ms"]:7.1f} ms   p99 {r["p99_ms"]:7.1f} ms   '
+              f'{r["requests"]} requests, {r["errors"]} errors')
+    print(f'  speedup {results["production"]["rps"] / results["debug"]["rps"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Gunicorn settings for the subtitle app (used by serve.py).
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Every setting can be overridden through the environment. The app keeps
+its job queue, caches' in-memory layer, rate limiter and metrics per
+process, so the default is a single worker with many threads; raise
+WEB_WORKERS only if the job API is not used (a job polled on another
+worker is not found) and YTDLP_RATE is divided by the worker count.
+"""
+import os
+
+# Resolve app:app and serve.py relative to this file wherever gunicorn starts
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get('SUBTITLES_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', 1))
+# Requests mostly wait on YouTube, so threads rather than processes carry the load
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 16))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+# Uncached extractions can take tens of seconds
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+backlog = int(os.environ.get('WEB_BACKLOG', 2048))
+
+# Import the app (and yt-dlp with its extractors) once in the master, so
+# workers fork with it loaded instead of each paying the import on startup
+preload_app = True
+
+accesslog = os.environ.get('WEB_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('WEB_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    from serve import warm_up
+    warm_up()
+
+
+def worker_exit(server, worker):
+    # In-flight requests have drained; let running extractions finish and
+    # drop jobs that never started
+    from serve import shutdown_app
+    shutdown_app()
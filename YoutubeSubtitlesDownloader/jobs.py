@@ -0,0 +1,158 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states; the last three are final
+QUEUED, RUNNING, DONE, ERROR, TIMEOUT = 'queued', 'running', 'done', 'error', 'timeout'
+FINAL_STATES = (DONE, ERROR, TIMEOUT)
+
+
+class QueueFullError(Exception):
+    """Raised when accepting a job would exceed the queue capacity"""
+
+
+class Job:
+    """One subtitle extraction tracked by the JobQueue"""
+
+    def __init__(self, url, video_id, lang):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.video_id = video_id
+        self.lang = lang
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def key(self):
+        return (self.video_id, self.lang)
+
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'url': self.url,
+            'video_id': self.video_id,
+            'lang': self.lang,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == DONE:
+            data['result'] = self.result
+        elif self.error:
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """Bounded worker pool running subtitle extraction jobs in the background.
+
+    Identical (video_id, lang) requests share one in-flight job, submissions
+    beyond `max_pending` unfinished jobs raise QueueFullError, and a job that
+    runs longer than `timeout` seconds is reported as timed out. A worker
+    thread cannot be interrupted, so a timed-out job stays in flight (holding
+    its capacity and sharing its key) until its extraction actually returns.
+    """
+
+    def __init__(self, worker, max_workers=4, max_pending=64, timeout=120, retention=3600):
+        self.worker = worker
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='subtitle-job')
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, url, video_id, lang=None):
+        """Queue one extraction, returning the new or already in-flight Job"""
+        return self.submit_many([(url, video_id, lang)])[0]
+
+    def submit_many(self, items):
+        """Queue (url, video_id, lang) items all-or-nothing; returns their Jobs"""
+        with self._lock:
+            self._expire_locked()
+            jobs = []
+            new_jobs = []
+            for url, video_id, lang in items:
+                job_id = self._in_flight.get((video_id, lang))
+                if job_id is None:
+                    # Duplicates within the same batch also share one job
+                    job = next((j for j in new_jobs if j.key == (video_id, lang)), None)
+                    if job is None:
+                        job = Job(url, video_id, lang)
+                        new_jobs.append(job)
+                else:
+                    job = self._jobs[job_id]
+                jobs.append(job)
+
+            if len(self._in_flight) + len(new_jobs) > self.max_pending:
+                raise QueueFullError(
+                    f'Job queue is full ({len(self._in_flight)}/{self.max_pending} jobs pending)')
+
+            for job in new_jobs:
+                self._jobs[job.id] = job
+                self._in_flight[job.key] = job.id
+                self._executor.submit(self._run, job)
+            return jobs
+
+    def get(self, job_id):
+        """Return the Job with this id, or None"""
+        with self._lock:
+            self._expire_locked()
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            self._expire_locked()
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINAL_STATES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            # Timed-out jobs whose worker is still busy
+            counts['overdue'] = sum(1 for job_id in self._in_flight.values()
+                                    if self._jobs[job_id].status == TIMEOUT)
+            counts['capacity'] = self.max_pending
+            return counts
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """Stop accepting work; with wait=True let running extractions finish.
+
+        Queued jobs still run unless cancel_pending is set (or wait is False).
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_pending or not wait)
+
+    def _run(self, job):
+        with self._lock:
+            if job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = self.worker(job.url, job.video_id, job.lang)
+            status, error = DONE, None
+        except Exception as e:
+            result, status, error = None, ERROR, str(e)
+        with self._lock:
+            # A job already reported as timed out keeps that status
+            if job.status == RUNNING:
+                job.status, job.result, job.error = status, result, error
+                job.finished_at = time.time()
+            # Only now is the worker free again, timed out or not
+            self._in_flight.pop(job.key, None)
+
+    def _expire_locked(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.status == RUNNING and now - job.started_at > self.timeout:
+                # Stays in _in_flight until _run returns; see the class docstring
+                job.status = TIMEOUT
+                job.error = f'Job exceeded the {self.timeout}s timeout'
+                job.finished_at = now
+            elif (job.status in FINAL_STATES and now - job.finished_at > self.retention
+                  and self._in_flight.get(job.key) != job_id):
+                del self._jobs[job_id]
@@ -0,0 +1,248 @@
+import json
+import logging
+import queue
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe counters and histograms rendered in the Prometheus text format.
+
+    Values owned by other components (cache stats, limiter counters) are
+    pulled at scrape time through collectors registered with add_collector.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collect):
+        """collect() returns [(name, kind, help, value, labels_dict)] at scrape time"""
+        self._collectors.append(collect)
+
+    def render(self):
+        samples = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append(f'{name}{_format_labels(labels)} {value}')
+            for (name, labels), histogram in self._histograms.items():
+                lines = samples.setdefault(name, [])
+                cumulative = 0
+                for bound, count in zip(self.bucket_labels(histogram), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        for collect in self._collectors:
+            for name, kind, help_text, value, labels in collect():
+                self._help.setdefault(name, (kind, help_text))
+                samples.setdefault(name, []).append(
+                    f'{name}{_format_labels(tuple(sorted(labels.items())))} {value}')
+
+        out = []
+        for name in sorted(samples):
+            kind, help_text = self._help.get(name, ('untyped', ''))
+            if help_text:
+                out.append(f'# HELP {name} {help_text}')
+            out.append(f'# TYPE {name} {kind}')
+            out.extend(samples[name])
+        return '\n'.join(out) + '\n'
+
+    @staticmethod
+    def bucket_labels(histogram):
+        return [repr(float(b)) for b in histogram.buckets] + ['+Inf']
+
+
+class RequestTimer:
+    """Phase durations for one request, reported in its log line"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.status = None
+        self.error = None
+
+
+class RequestLogWriter:
+    """Formats and writes request log lines on a background thread.
+
+    The request thread only enqueues a tuple; building the JSON line and
+    going through the logging handlers happens off the request path.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, entry):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='request-log', daemon=True)
+                    self._thread.start()
+        self._queue.put(entry)
+
+    def _run(self):
+        while True:
+            ts, method, endpoint, status, elapsed, phases, error = self._queue.get()
+            record = {
+                'ts': round(ts, 3),
+                'method': method,
+                'endpoint': endpoint,
+                'status': status,
+                'duration_ms': round(elapsed * 1000, 3),
+                'phases_ms': {name: round(s * 1000, 3) for name, s in phases.items()},
+            }
+            if error:
+                record['error'] = error
+            try:
+                self.logger.info(json.dumps(record))
+            except Exception:
+                pass
+
+    def flush(self, timeout=5.0):
+        """Wait until queued lines have been written (for tests and shutdown)"""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+metrics = Metrics()
+request_log = logging.getLogger('subtitles.requests')
+request_log_writer = RequestLogWriter(request_log)
+
+metrics.describe('http_requests_total', 'counter', 'HTTP requests by endpoint, method and status')
+metrics.describe('http_request_duration_seconds', 'histogram', 'Time to serve a request, including streamed bodies')
+metrics.describe('subtitle_phase_seconds', 'histogram', 'Time spent in each phase of subtitle handling')
+metrics.describe('subtitle_errors_total', 'counter', 'Failed requests by endpoint and error type')
+
+
+@contextmanager
+def phase(name):
+    """Time a block as `name` in the phase histogram and the current request's log line"""
+    if not metrics.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe('subtitle_phase_seconds', elapsed, phase=name)
+        timer = g.get('request_timer') if has_request_context() else None
+        if timer is not None:
+            timer.phases[name] = round(timer.phases.get(name, 0.0) + elapsed, 6)
+
+
+def record_error(endpoint, exc):
+    if not metrics.enabled:
+        return
+    metrics.inc('subtitle_errors_total', endpoint=endpoint, type=type(exc).__name__)
+    if has_request_context() and g.get('request_timer') is not None:
+        g.request_timer.error = f'{type(exc).__name__}: {exc}'
+
+
+def timed_chunks(chunks, name='serialize'):
+    """Wrap a response generator so the time spent producing it counts as a phase"""
+    if not metrics.enabled:
+        yield from chunks
+        return
+    # Summed locally and recorded once, not per chunk
+    elapsed = 0.0
+    iterator = iter(chunks)
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - started
+            yield chunk
+    finally:
+        metrics.observe('subtitle_phase_seconds', elapsed, phase=name)
+        timer = g.get('request_timer') if has_request_context() else None
+        if timer is not None:
+            timer.phases[name] = round(timer.phases.get(name, 0.0) + elapsed, 6)
+
+
+def init_app(app):
+    """Install the request hooks that feed http_* metrics and the JSON request log"""
+
+    @app.before_request
+    def start_timer():
+        if metrics.enabled:
+            g.request_timer = RequestTimer()
+
+    @app.after_request
+    def finish_timer(response):
+        timer = g.get('request_timer')
+        if timer is None:
+            return response
+        timer.status = response.status_code
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        method = request.method
+
+        # Runs once the body, including streamed downloads, has been sent
+        def on_close():
+            elapsed = time.perf_counter() - timer.started
+            metrics.inc('http_requests_total', endpoint=endpoint, method=method, status=timer.status)
+            metrics.observe('http_request_duration_seconds', elapsed, endpoint=endpoint)
+            if request_log.isEnabledFor(logging.INFO):
+                request_log_writer.submit((time.time(), method, endpoint, timer.status,
+                                           elapsed, timer.phases, timer.error))
+
+        response.call_on_close(on_close)
+        return response
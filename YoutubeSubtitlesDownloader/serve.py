@@ -0,0 +1,89 @@
+"""Production entry point for the subtitle app.
+
+Runs app:app on gunicorn with the settings in gunicorn.conf.py (threaded
+workers, keep-alive, yt-dlp preloaded before forking, graceful shutdown).
+Where gunicorn is not available (Windows) it falls back to waitress with
+the same environment variables.
+
+Usage: python serve.py [--bind 0.0.0.0:5000] [--workers N] [--threads N]
+"""
+import argparse
+import importlib
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(APP_DIR, 'gunicorn.conf.py')
+
+
+def warm_up():
+    """Load yt-dlp and the YouTube extractor so the first request does not pay for it"""
+    from ytdlp_common.extract_cache import preload_ytdlp
+    preload_ytdlp()
+
+
+def shutdown_app():
+    """Finish running background extractions, drop queued ones, flush the request log"""
+    from app import job_queue
+    from metrics import request_log_writer
+    job_queue.shutdown(wait=True, cancel_pending=True)
+    request_log_writer.flush()
+
+
+def run_gunicorn(app_spec, bind=None, workers=None, threads=None):
+    from gunicorn.app.wsgiapp import WSGIApplication
+    argv = ['gunicorn', '-c', CONFIG_FILE]
+    if bind:
+        argv += ['--bind', bind]
+    if workers:
+        argv += ['--workers', str(workers)]
+    if threads:
+        argv += ['--threads', str(threads)]
+    sys.argv = argv + [app_spec]
+    WSGIApplication('%(prog)s [OPTIONS] [APP_MODULE]', prog='gunicorn').run()
+
+
+def run_waitress(app_spec, bind=None, threads=None):
+    import waitress
+    module, _, attr = app_spec.partition(':')
+    app = getattr(importlib.import_module(module), attr or 'app')
+    warm_up()
+    bind = bind or os.environ.get('SUBTITLES_BIND', '0.0.0.0:5000')
+    try:
+        waitress.serve(
+            app,
+            listen=bind,
+            threads=threads or int(os.environ.get('WEB_THREADS', 16)),
+            # Idle keep-alive connections are closed after this many seconds
+            channel_timeout=int(os.environ.get('WEB_KEEPALIVE', 5)),
+            backlog=int(os.environ.get('WEB_BACKLOG', 2048)),
+            ident='subtitles',
+        )
+    finally:
+        shutdown_app()
+
+
+def serve(app_spec='app:app', bind=None, workers=None, threads=None):
+    """Serve app_spec on gunicorn, or on waitress when gunicorn cannot be imported"""
+    try:
+        import gunicorn  # noqa: F401 (POSIX only)
+    except ImportError:
+        if workers and workers > 1:
+            print('waitress runs a single process; ignoring --workers', file=sys.stderr)
+        run_waitress(app_spec, bind, threads)
+    else:
+        run_gunicorn(app_spec, bind, workers, threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', help='host:port (default $SUBTITLES_BIND or 0.0.0.0:5000)')
+    parser.add_argument('--workers', type=int, help='worker processes (default $WEB_WORKERS or 1)')
+    parser.add_argument('--threads', type=int, help='threads per worker (default $WEB_THREADS or 16)')
+    args = parser.parse_args()
+    sys.path.insert(0, APP_DIR)
+    serve(bind=args.bind, workers=args.workers, threads=args.threads)
+
+
+if __name__ == '__main__':
+    main()
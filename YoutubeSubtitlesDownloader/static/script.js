@@ -5,6 +5,7 @@
 // Store current subtitles data
 let currentSubtitles = null;
 let currentVideoId = null;
+let currentLang = null;
 
 // DOM elements
 const urlForm = document.getElementById('urlForm');
@@ -115,6 +116,7 @@ urlForm.addEventListener('submit', async (e) => {
         if (data.success && data.subtitles) {
             currentSubtitles = data.subtitles;
             currentVideoId = data.video_id;
+            currentLang = data.lang;
             displaySubtitles(data.subtitles);
             showSuccess('Subtitles loaded successfully!');
         } else {
@@ -125,6 +127,7 @@ urlForm.addEventListener('submit', async (e) => {
         showError(error.message);
         currentSubtitles = null;
         currentVideoId = null;
+        currentLang = null;
     } finally {
         setLoading(false);
     }
@@ -142,9 +145,10 @@ downloadBtn.addEventListener('click', async () => {
             headers: {
                 'Content-Type': 'application/json',
             },
+            // The server keeps the transcript; only send a reference to it
             body: JSON.stringify({
-                subtitles: currentSubtitles,
                 video_id: currentVideoId,
+                lang: currentLang,
             }),
         });
         
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# set() writes video_id and stored_at ahead of the subtitles, so a sweep can
+# read them from the start of each file without loading the whole transcript
+HEAD_BYTES = 1024
+HEAD_RE = re.compile(r'^\{"video_id": ("(?:[^"\\]|\\.)*"), .*?"stored_at": ([0-9.eE+-]+)', re.S)
+
+
+class SubtitleCache:
+    """Two-tier cache for parsed transcripts keyed by (video_id, lang).
+
+    The first tier is an in-process LRU bounded by entry count and TTL, the
+    second a content-addressed directory of JSON files that survives restarts.
+    """
+
+    def __init__(self, cache_dir, max_entries=256, ttl=24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(video_id, lang):
+        """Hash (video_id, lang) into the content address used on disk"""
+        return hashlib.sha256(f'{video_id}\0{lang}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, video_id, lang):
+        """Return the cached entry dict or None"""
+        key = self.make_key(video_id, lang)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry['stored_at']):
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return entry
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = None
+
+        expired = entry is not None and self._expired(entry.get('stored_at', 0))
+        if expired:
+            self._remove(path)
+        with self._lock:
+            if entry is None or expired:
+                self.stats['misses'] += 1
+                return None
+            self._remember(key, entry)
+            self.stats['disk_hits'] += 1
+        return entry
+
+    def set(self, video_id, lang, transcript, resolved_lang=None):
+        """Store a parsed transcript under (video_id, lang)"""
+        key = self.make_key(video_id, lang)
+        entry = {
+            'video_id': video_id,
+            'lang': resolved_lang or lang,
+            'key_lang': lang,
+            'stored_at': time.time(),
+            'subtitles': transcript,
+        }
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, entry)
+            self.stats['stores'] += 1
+        return entry
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _read_head(path):
+        """(video_id, stored_at) from the start of an entry file, or None if unreadable"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                match = HEAD_RE.match(f.read(HEAD_BYTES))
+            if match:
+                return json.loads(match.group(1)), float(match.group(2))
+        except (OSError, UnicodeDecodeError, ValueError):
+            pass
+        return None
+
+    def purge(self, video_id=None, lang=None):
+        """Remove entries; no arguments clears the whole cache.
+
+        Purging one video also sweeps expired files. Files that can't be read
+        are left alone unless the whole cache is cleared. Returns the number
+        of on-disk entries removed.
+        """
+        if video_id is not None and lang is not None:
+            keys = {self.make_key(video_id, lang)}
+        else:
+            keys = None
+
+        removed = 0
+        with self._lock:
+            for key in list(self._memory):
+                entry = self._memory[key]
+                if keys is not None:
+                    if key in keys:
+                        del self._memory[key]
+                elif video_id is None or entry['video_id'] == video_id:
+                    del self._memory[key]
+
+        if keys is not None:
+            return sum(self._remove(self._path(key)) for key in keys)
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                if video_id is not None:
+                    head = self._read_head(path)
+                    if head is None:
+                        continue
+                    if head[0] != video_id and not self._expired(head[1]):
+                        continue
+                removed += self._remove(path)
+        return removed
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,183 @@
+import html
+import io
+import logging
+import os
+import re
+from collections import namedtuple
+
+# Compact cue record; times are integer milliseconds
+Cue = namedtuple('Cue', ['start_ms', 'end_ms', 'text'])
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r'<[^>]*>')
+# Start and end timestamps; hours are optional in WebVTT, cue settings may follow.
+# Some generators also leave out the milliseconds (00:01:02 --> 00:01:05)
+TIMING_RE = re.compile(
+    r'\s*(?:(\d+):)?(\d+):(\d+)(?:[.,](\d+))?\s*-->\s*(?:(\d+):)?(\d+):(\d+)(?:[.,](\d+))?')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_timing(line):
+    """Return (start_ms, end_ms) for a cue timing line, or (None, None)"""
+    # Fast path for the canonical 'HH:MM:SS,mmm --> HH:MM:SS,mmm' layout: each
+    # timestamp's digits are read as one HHMMSSmmm integer
+    if line[12:17] == ' --> ' and line[2] == ':' and line[19:20] == ':':
+        try:
+            start = int(line[0:2] + line[3:5] + line[6:8] + line[9:12])
+            end = int(line[17:19] + line[20:22] + line[23:25] + line[26:29])
+        except ValueError:
+            pass
+        else:
+            if start >= 0 and end >= 0:
+                return (start // 10000000 * 3600000 + start // 100000 % 100 * 60000 + start % 100000,
+                        end // 10000000 * 3600000 + end // 100000 % 100 * 60000 + end % 100000)
+    match = TIMING_RE.match(line)
+    if not match:
+        return None, None
+    h1, m1, s1, f1, h2, m2, s2, f2 = match.groups()
+    start_ms = ((int(h1 or 0) * 60 + int(m1)) * 60 + int(s1)) * 1000 + int((f1 or '0').ljust(3, '0')[:3])
+    end_ms = ((int(h2 or 0) * 60 + int(m2)) * 60 + int(s2)) * 1000 + int((f2 or '0').ljust(3, '0')[:3])
+    return start_ms, end_ms
+
+
+def clean_text(line):
+    """Strip styling tags (<b>, <c.color>, <00:00:01.000>) and decode entities"""
+    if '<' in line:
+        line = TAG_RE.sub('', line)
+    if '&' in line:
+        line = html.unescape(line)
+    return line.strip()
+
+
+def _open_text(source):
+    """Return (text stream, owned) for a path, bytes, str content, binary or text stream"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if isinstance(source, str):
+        # A str is the subtitle text itself (e.g. from a stub SUBTITLE_HTTP_GET)
+        return io.StringIO(source[1:] if source.startswith('\ufeff') else source), False
+    if isinstance(source, os.PathLike):
+        return open(source, 'r', encoding='utf-8-sig', newline=None), True
+    if isinstance(source, io.TextIOBase):
+        return source, False
+    # Binary stream: decode incrementally, newline=None folds CRLF/CR into \n
+    return io.TextIOWrapper(source, encoding='utf-8-sig', newline=None), False
+
+
+def _iter_blocks(stream, chunk_size=CHUNK_SIZE):
+    """Yield blank-line separated blocks, reading the stream in fixed-size chunks"""
+    tail = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if '\r' in chunk:
+            if chunk.endswith('\r'):
+                # Keep a CRLF pair together across the chunk boundary
+                chunk += stream.read(1)
+            chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
+        blocks = (tail + chunk).split('\n\n')
+        tail = blocks.pop()
+        yield from blocks
+    if tail:
+        yield tail
+
+
+def iter_cues(source):
+    """Parse SRT or WebVTT from a path (os.PathLike), bytes, str or stream, yielding Cue records.
+
+    The input is read in fixed-size chunks and split into cue blocks, so memory
+    stays bounded regardless of track length and every byte is scanned once.
+    """
+    for cue in _iter_cue_tuples(source):
+        yield Cue._make(cue)
+
+
+def _iter_cue_tuples(source):
+    """iter_cues as plain (start_ms, end_ms, text) tuples"""
+    stream, owned = _open_text(source)
+    try:
+        yield from _parse_blocks(_iter_blocks(stream))
+    finally:
+        if owned:
+            stream.close()
+
+
+def _parse_blocks(blocks):
+    for block in blocks:
+        arrows = block.count('-->')
+        # Headers, NOTE/STYLE/REGION blocks and stray indices have no timing line
+        if not arrows:
+            continue
+        lines = block.split('\n')
+        # Fast path for the usual block: one timing line, first or after an SRT
+        # index / VTT cue id, followed by plain text lines
+        if arrows == 1 and '<' not in block and '&' not in block:
+            t = 0 if '-->' in lines[0] else 1 if '-->' in lines[1] else -1
+            if t >= 0:
+                start_ms, end_ms = parse_timing(lines[t])
+                if start_ms is not None:
+                    if len(lines) == t + 2:
+                        text = lines[t + 1].strip()
+                        if text:
+                            yield start_ms, end_ms, text
+                            continue
+                    else:
+                        texts = [line.strip() for line in lines[t + 1:]]
+                        if all(texts):
+                            if texts:
+                                yield start_ms, end_ms, ' '.join(texts)
+                            continue
+        yield from _parse_lines(lines)
+
+
+def _parse_lines(lines):
+    """General case for one block: cues not separated by a truly empty line,
+    text containing '-->', markup and entities, whitespace-only separator lines"""
+    start_ms = end_ms = None
+    text = []
+    for line in lines:
+        # Only a line that parses as a timing starts a cue; otherwise
+        # '-->' is just part of the cue text
+        timing = parse_timing(line) if '-->' in line else (None, None)
+        if timing[0] is not None:
+            if text:
+                yield start_ms, end_ms, ' '.join(text)
+                text = []
+            start_ms, end_ms = timing
+        elif not line.strip():
+            # A line of only spaces still separates cues
+            if text:
+                yield start_ms, end_ms, ' '.join(text)
+                text = []
+            start_ms = end_ms = None
+        elif start_ms is None:
+            # Lines before the timing line are SRT indices or VTT cue ids
+            if '-->' in line:
+                logger.warning('Skipping cue with an unrecognized timing line: %r', line)
+        else:
+            if '<' in line or '&' in line:
+                line = clean_text(line)
+            else:
+                line = line.strip()
+            if line:
+                text.append(line)
+    if text:
+        yield start_ms, end_ms, ' '.join(text)
+
+
+def cue_to_entry(cue):
+    """Convert a Cue to the transcript dict returned by the API"""
+    return {
+        'start': cue.start_ms / 1000.0,
+        'duration': (cue.end_ms - cue.start_ms) / 1000.0,
+        'text': cue.text,
+    }
+
+
+def parse_transcript(source):
+    """Parse a subtitle track into the list of transcript dicts"""
+    # Same as cue_to_entry, inlined: this runs once per cue of every track
+    return [{'start': start_ms / 1000.0, 'duration': (end_ms - start_ms) / 1000.0, 'text': text}
+            for start_ms, end_ms, text in _iter_cue_tuples(source)]
@@ -0,0 +1,62 @@
+import json
+
+# Cues are grouped into chunks of this many before being handed to the server
+CUES_PER_CHUNK = 256
+
+
+def format_timestamp(ms, sep=','):
+    """Format integer milliseconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)"""
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{sep}{ms:03d}"
+
+
+def iter_entry_times(transcript):
+    """Yield (start_ms, end_ms, text) for transcript dicts given in seconds"""
+    for entry in transcript:
+        start = entry['start']
+        yield round(start * 1000), round((start + entry['duration']) * 1000), entry['text']
+
+
+def write_srt(cues):
+    for i, (start_ms, end_ms, text) in enumerate(cues, 1):
+        yield f"{i}\n{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}\n{text}\n\n"
+
+
+def write_vtt(cues):
+    yield "WEBVTT\n\n"
+    for start_ms, end_ms, text in cues:
+        yield f"{format_timestamp(start_ms, '.')} --> {format_timestamp(end_ms, '.')}\n{text}\n\n"
+
+
+def write_txt(cues):
+    for _, _, text in cues:
+        yield f"{text}\n"
+
+
+def write_jsonl(cues):
+    for start_ms, end_ms, text in cues:
+        record = {'start': start_ms / 1000.0, 'duration': (end_ms - start_ms) / 1000.0, 'text': text}
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+# format -> (writer, mimetype, file extension)
+FORMATS = {
+    'srt': (write_srt, 'application/x-subrip', 'srt'),
+    'vtt': (write_vtt, 'text/vtt', 'vtt'),
+    'txt': (write_txt, 'text/plain', 'txt'),
+    'jsonl': (write_jsonl, 'application/jsonl', 'jsonl'),
+}
+
+
+def iter_encoded_chunks(pieces, size=CUES_PER_CHUNK):
+    """Join formatted cues into UTF-8 chunks of `size` cues each"""
+    buffer = []
+    for piece in pieces:
+        buffer.append(piece)
+        if len(buffer) >= size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
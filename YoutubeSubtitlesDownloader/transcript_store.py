@@ -0,0 +1,183 @@
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from subtitle_writer import iter_entry_times
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercased word tokens used by the keyword index and queries"""
+    return WORD_RE.findall(text.lower())
+
+
+class Transcript:
+    """Compact, query-friendly form of one parsed transcript.
+
+    Start and end times are integer milliseconds in parallel arrays sorted by
+    start, and all cue texts share one string addressed by offsets, so a
+    transcript costs a few dozen bytes per cue instead of a dict per cue.
+    The keyword index is built on the first search.
+    """
+
+    def __init__(self, cues, lang=None):
+        """cues: iterable of (start_ms, end_ms, text)"""
+        cues = sorted(cues, key=lambda cue: cue[0])
+        self.lang = lang
+        self.starts = array('q', (cue[0] for cue in cues))
+        self.ends = array('q', (cue[1] for cue in cues))
+        self._offsets = array('q', [0])
+        position = 0
+        for cue in cues:
+            position += len(cue[2])
+            self._offsets.append(position)
+        self._text = ''.join(cue[2] for cue in cues)
+        # Longest cue, so a window search can start early enough to catch
+        # cues that begin before the window but are still showing inside it
+        self.max_duration_ms = max((end - start for start, end in zip(self.starts, self.ends)), default=0)
+        self._index = None
+        self._index_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entries(cls, entries, lang=None):
+        """Build from the API's transcript dicts (start/duration in seconds)"""
+        return cls(iter_entry_times(entries), lang=lang)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def duration(self):
+        """End of the last cue in seconds"""
+        return max(self.ends, default=0) / 1000.0
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by this transcript, index included"""
+        return (sys.getsizeof(self._text) + self.starts.itemsize * len(self.starts) * 2
+                + self._offsets.itemsize * len(self._offsets) + self._index_bytes)
+
+    def text(self, i):
+        return self._text[self._offsets[i]:self._offsets[i + 1]]
+
+    def window(self, start_ms=None, end_ms=None):
+        """range of candidate cue indices for [start_ms, end_ms); see select()"""
+        lo = 0 if start_ms is None else bisect_left(self.starts, start_ms - self.max_duration_ms)
+        hi = len(self.starts) if end_ms is None else bisect_left(self.starts, end_ms)
+        return range(lo, hi)
+
+    def _build_index(self):
+        index = {}
+        for i in range(len(self.starts)):
+            for word in set(tokenize(self.text(i))):
+                postings = index.get(word)
+                if postings is None:
+                    postings = index[word] = array('l')
+                postings.append(i)
+        self._index_bytes = sys.getsizeof(index) + sum(
+            sys.getsizeof(word) + sys.getsizeof(postings) for word, postings in index.items())
+        return index
+
+    def search(self, query):
+        """Sorted indices of cues containing every word of query"""
+        words = set(tokenize(query))
+        if not words:
+            return []
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index()
+        postings = sorted((self._index.get(word, ()) for word in words), key=len)
+        smallest, rest = postings[0], postings[1:]
+        matches = []
+        for i in smallest:
+            for other in rest:
+                j = bisect_left(other, i)
+                if j == len(other) or other[j] != i:
+                    break
+            else:
+                matches.append(i)
+        return matches
+
+    def select(self, start_ms=None, end_ms=None, query=None):
+        """Indices of cues overlapping [start_ms, end_ms) that match query (if any)"""
+        candidates = self.window(start_ms, end_ms)
+        if query:
+            matches = self.search(query)
+            lo, hi = candidates.start, candidates.stop
+            candidates = matches[bisect_left(matches, lo):bisect_left(matches, hi)]
+        if start_ms is None:
+            return list(candidates)
+        ends = self.ends
+        return [i for i in candidates if ends[i] > start_ms]
+
+    def iter_cues(self, indices=None):
+        """Yield (start_ms, end_ms, text) for the writers in subtitle_writer"""
+        if indices is None:
+            indices = range(len(self.starts))
+        for i in indices:
+            yield self.starts[i], self.ends[i], self.text(i)
+
+    def entries(self, indices=None):
+        """Transcript dicts as returned by the API, with each cue's index"""
+        return [
+            {'index': i, 'start': start_ms / 1000.0, 'duration': (end_ms - start_ms) / 1000.0, 'text': text}
+            for i, (start_ms, end_ms, text) in zip(
+                indices if indices is not None else range(len(self.starts)), self.iter_cues(indices))
+        ]
+
+
+class TranscriptStore:
+    """In-process LRU of Transcript objects bounded by their approximate size"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, key):
+        with self._lock:
+            transcript = self._entries.get(key)
+            if transcript is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return transcript
+
+    def put(self, key, transcript):
+        with self._lock:
+            self._entries[key] = transcript
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+            # Sizes are re-read because a keyword index may have been built since
+            total = sum(entry.nbytes for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.nbytes
+                self.stats['evictions'] += 1
+
+    def purge(self, video_id=None, lang=None):
+        """Drop entries keyed (video_id, lang); no arguments clears the store.
+
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (video_id is None or key[0] == video_id) and (lang is None or key[1] == lang)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = sum(entry.nbytes for entry in self._entries.values())
+        return stats
@@ -0,0 +1,342 @@
+"""Offline benchmark suite for the Python entry points in this repository.
+
+Every backend is faked (YTDLP_BACKEND=fake, ARXIV_BACKEND=fake,
+SCHOLAR_BACKEND=stub), so no network is used. The subtitle app is driven
+through the Flask test client; the MCP servers' tools and resources are
+called as plain functions. Each scenario is run for every corpus size and
+concurrency level, each combination in a fresh process, and the throughput,
+p50/p99 latency and peak RSS are written as JSON. A stored baseline can be
+compared against the current tree.
+
+Scenarios and what --sizes means for them:
+  subtitles.get             POST /api/subtitles, new video each call (cues per track)
+  subtitles.get_cached      POST /api/subtitles, same video (cues per track)
+  subtitles.download        POST /api/download with the cues in the body (cues)
+  subtitles.download_by_id  POST /api/download with a video_id reference (cues)
+  research.search_papers    search_papers on new topics (papers already stored)
+  research.extract_info     extract_info on stored papers (papers stored)
+  research.get_topic_papers papers://{topic} resource (papers stored)
+  scholar.search_scholar    search_scholar on new queries (results already cached)
+  scholar.search_cached     search_scholar on cached queries (results cached)
+  video.download_video      download_video of a new video each call (KB per video)
+
+Usage:
+  python benchmarks/run_benchmarks.py [--sizes 100,1000] [--concurrency 1,8] [--requests 200]
+      [--scenarios subtitles.get,research.extract_info] [--output results.json]
+      [--baseline baseline.json [--tolerance 0.15] [--fail-on-regression]]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SUBTITLES_DIR = os.path.join(ROOT, 'YoutubeSubtitlesDownloader')
+RESEARCH_DIR = os.path.join(ROOT, 'MyOwnMCPs', 'research-server-streamable', 'python')
+SCHOLAR_DIR = os.path.join(ROOT, 'MyOwnMCPs', 'scholar-assistant')
+VIDEO_DIR = os.path.join(ROOT, 'MyOwnMCPs', 'video-downloader')
+
+
+def load_module(name, directory, filename):
+    """Import a server script by path, with its directory on sys.path for its own imports"""
+    sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def tool_fn(tool):
+    """The plain function behind an MCP tool or resource; newer fastmcp wraps it in a FunctionTool"""
+    return getattr(tool, 'fn', tool)
+
+
+def video_url(n):
+    return f'https://www.youtube.com/watch?v={n:011d}'
+
+
+# Helper: scenarios. Each setup(size) prepares state and returns op(i)
+
+def setup_subtitles(size, scenario):
+    os.environ['FAKE_YTDLP_CUES'] = str(size)
+    sys.path.insert(0, ROOT)
+    app_module = load_module('app', SUBTITLES_DIR, 'app.py')
+    client = app_module.app.test_client()
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        response.get_data()
+        response.close()
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} answered {response.status_code}')
+
+    first = client.post('/api/subtitles', json={'url': video_url(0)})
+    transcript = first.get_json()['subtitles']
+    first.close()
+    if scenario == 'subtitles.get':
+        return lambda i: post('/api/subtitles', {'url': video_url(i + 1)})
+    if scenario == 'subtitles.get_cached':
+        return lambda i: post('/api/subtitles', {'url': video_url(0)})
+    if scenario == 'subtitles.download':
+        return lambda i: post('/api/download', {'subtitles': transcript, 'video_id': f'{0:011d}'})
+    return lambda i: post('/api/download', {'video_id': f'{0:011d}'})
+
+
+def setup_research(size, scenario):
+    server = load_module('research_server', RESEARCH_DIR, 'research-server-streamable.py')
+    search_papers = tool_fn(server.search_papers)
+    extract_info = tool_fn(server.extract_info)
+    get_topic_papers = tool_fn(server.get_topic_papers)
+    topics = [f'corpus topic {t}' for t in range(max(1, size // 10))]
+    paper_ids = []
+    for topic in topics:
+        paper_ids.extend(server.fetch_and_store(topic, 10))
+    if scenario == 'research.search_papers':
+        return lambda i: asyncio.run(search_papers(f'new topic {i}', 5))
+    if scenario == 'research.extract_info':
+        return lambda i: extract_info(paper_ids[i % len(paper_ids)])
+    return lambda i: get_topic_papers(topics[i % len(topics)])
+
+
+def setup_scholar(size, scenario):
+    os.environ['STUB_SCHOLAR_RESULTS'] = str(max(size, 10))
+    server = load_module('scholar_server', SCHOLAR_DIR, 'server.py')
+    search_scholar = tool_fn(server.search_scholar)
+    queries = [f'cached query {q}' for q in range(max(1, size // 10))]
+    for query in queries:
+        server.fetch_results(query, 0, 10)
+    if scenario == 'scholar.search_scholar':
+        return lambda i: search_scholar(f'new query {i}', limit=10)
+    return lambda i: search_scholar(queries[i % len(queries)], limit=10)
+
+
+def setup_video(size, scenario):
+    os.environ['FAKE_YTDLP_BYTES'] = str(size * 1024)
+    sys.path.insert(0, ROOT)
+    server = load_module('video_server', VIDEO_DIR, 'server.py')
+    download_video = tool_fn(server.download_video)
+
+    def download(i):
+        report = json.loads(asyncio.run(download_video(video_url(i + 1))))
+        if report['status'] != 'done':
+            raise RuntimeError(report.get('error') or report['status'])
+    return download
+
+
+SCENARIOS = {
+    'subtitles.get': setup_subtitles,
+    'subtitles.get_cached': setup_subtitles,
+    'subtitles.download': setup_subtitles,
+    'subtitles.download_by_id': setup_subtitles,
+    'research.search_papers': setup_research,
+    'research.extract_info': setup_research,
+    'research.get_topic_papers': setup_research,
+    'scholar.search_scholar': setup_scholar,
+    'scholar.search_cached': setup_scholar,
+    'video.download_video': setup_video,
+}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_cell(scenario, size, concurrency, requests, workdir):
+    """Child process side: set up one scenario and time `requests` calls"""
+    os.environ.update({
+        'YTDLP_BACKEND': 'fake',
+        'ARXIV_BACKEND': 'fake',
+        'SCHOLAR_BACKEND': 'stub',
+        # The limiter would otherwise pace the fake backend like YouTube
+        'YTDLP_RATE': '1000000000',
+        'YTDLP_BURST': '1000000',
+        'YTDLP_MAX_PER_HOST': '1000',
+        # Likewise the 3 s arXiv request interval for the fake arXiv
+        'ARXIV_REQUEST_INTERVAL': '0',
+        'YTDLP_INFO_CACHE_DIR': os.path.join(workdir, 'info'),
+        'SUBTITLE_CACHE_DIR': os.path.join(workdir, 'subtitles'),
+        'SCHOLAR_CACHE_DB': os.path.join(workdir, 'scholar_cache.db'),
+        'VIDEO_STATE_DIR': workdir,
+        'VIDEO_MAX_JOBS': str(max(2, concurrency)),
+        'REQUEST_LOG': '0',
+    })
+    os.chdir(workdir)
+    op = SCENARIOS[scenario](size, scenario)
+
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            op(i)
+        except Exception as e:
+            return time.perf_counter() - started, f'{type(e).__name__}: {e}'
+        return time.perf_counter() - started, None
+
+    # Warm-up calls use their own indices so "new item" scenarios stay uncached
+    for i in range(max(1, requests // 20)):
+        timed(10 ** 6 + i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for seconds, error in results if error is None)
+    errors = [error for _, error in results if error is not None]
+    return {
+        'scenario': scenario,
+        'size': size,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'seconds': round(elapsed, 4),
+        'throughput': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3) if latencies else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def spawn_cell(scenario, size, concurrency, requests):
+    with tempfile.TemporaryDirectory(prefix='bench_') as workdir:
+        output = os.path.join(workdir, 'result.json')
+        # Server scripts print progress; only the result file is read back
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--cell', scenario, str(size), str(concurrency),
+             str(requests), workdir, output],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if completed.returncode != 0 or not os.path.exists(output):
+            message = completed.stderr.decode('utf-8', 'replace').strip().splitlines()
+            return {'scenario': scenario, 'size': size, 'concurrency': concurrency, 'requests': requests,
+                    'failed': message[-1] if message else f'exit code {completed.returncode}'}
+        with open(output, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def cell_key(result):
+    return f"{result['scenario']} size={result['size']} c={result['concurrency']}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput and p99 changes against the baseline; returns the regressed cells"""
+    previous = {cell_key(r): r for r in baseline.get('results', []) if 'failed' not in r}
+    regressions = []
+    print(f"\nAgainst baseline {baseline.get('meta', {}).get('commit') or ''} "
+          f"(regression: throughput or p99 worse by more than {tolerance:.0%})")
+    for result in results:
+        key = cell_key(result)
+        old = previous.get(key)
+        if old is None or 'failed' in result:
+            continue
+        throughput = (result['throughput'] - old['throughput']) / old['throughput'] if old['throughput'] else 0.0
+        p99 = (result['p99_ms'] - old['p99_ms']) / old['p99_ms'] if old['p99_ms'] else 0.0
+        regressed = throughput < -tolerance or p99 > tolerance
+        if regressed:
+            regressions.append(key)
+        print(f"  {key:<44} throughput {throughput:+7.1%}   p99 {p99:+7.1%}{'   REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000')
+    parser.add_argument('--concurrency', default='1,8')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--cell', nargs=6, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cell:
+        scenario, size, concurrency, requests, workdir, output = args.cell
+        result = run_cell(scenario, int(size), int(concurrency), int(requests), workdir)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    scenarios = args.scenarios.split(',')
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(',')]
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    results = []
+    for scenario in scenarios:
+        for size in sizes:
+            for concurrency in levels:
+                result = spawn_cell(scenario, size, concurrency, args.requests)
+                if result.get('errors') == result['requests']:
+                    # Nothing was measured; don't let 0/s pass for a result
+                    result['failed'] = f"every request failed: {result['first_error']}"
+                results.append(result)
+                if 'failed' in result:
+                    print(f"  {cell_key(result):<44} FAILED: {result['failed']}")
+                    continue
+                print(f"  {cell_key(result):<44} {result['throughput']:9.1f}/s   p50 {result['p50_ms']:8.2f} ms   "
+                      f"p99 {result['p99_ms']:8.2f} ms   RSS {result['peak_rss_mb'] or 0:6.1f} MB"
+                      + (f"   {result['errors']} errors ({result['first_error']})" if result['errors'] else ''))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'requests': args.requests,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    failed = [cell_key(r) for r in results if 'failed' in r]
+    if failed:
+        print(f"\n{len(failed)} cells failed: {', '.join(failed)}")
+    if failed or (regressions and args.fail_on_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Helpers shared by the yt-dlp based tools in this repository."""
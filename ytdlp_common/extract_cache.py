@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ytdlp_common.ids import youtube_id
+
+
+def load_ytdlp():
+    """Return the yt_dlp module, imported on first use.
+
+    Loading it takes a few hundred milliseconds that servers spawned per
+    session should not pay up front. YTDLP_BACKEND=fake swaps in the offline
+    ytdlp_common.fake_ytdlp for tests and benchmarks.
+    """
+    if os.environ.get('YTDLP_BACKEND') == 'fake':
+        from ytdlp_common import fake_ytdlp
+        return fake_ytdlp
+    import yt_dlp
+    return yt_dlp
+
+
+def preload_ytdlp():
+    """Import yt-dlp and its YouTube extractor ahead of the first extraction"""
+    yt_dlp = load_ytdlp()
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+        ydl.get_info_extractor('Youtube')
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser('~'), '.cache', 'ytdlp_common', 'info')
+
+
+def canonical_key(url):
+    """Cache key for a URL: 'youtube:<id>' for any form of a YouTube video URL, else the URL.
+
+    URLs carrying a playlist (watch?v=X&list=Y) keep their own key, so they
+    never pick up the single-video entry of X.
+    """
+    video_id = youtube_id(url)
+    if video_id:
+        return f'youtube:{video_id}'
+    return f'url:{url}'
+
+
+class ExtractCache:
+    """Disk cache of sanitized extract_info results, keyed by canonical video ID.
+
+    Entries expire after `ttl` seconds (stream URLs in the info are signed
+    and go stale after a few hours) and the least recently used files are
+    evicted once the directory grows past `max_bytes`. Only single videos
+    are cached; playlists are always extracted fresh.
+    """
+
+    def __init__(self, cache_dir, ttl=3600, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file())
+
+    @classmethod
+    def from_env(cls):
+        """Build an ExtractCache from YTDLP_INFO_CACHE_* environment variables"""
+        env = os.environ.get
+        return cls(
+            env('YTDLP_INFO_CACHE_DIR', default_cache_dir()),
+            ttl=int(env('YTDLP_INFO_CACHE_TTL', 3600)),
+            max_bytes=int(env('YTDLP_INFO_CACHE_MB', 200)) * 1024 * 1024,
+        )
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def get(self, key):
+        """Return the cached info dict for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._count('misses')
+            return None
+        if time.time() - entry.get('stored_at', 0) > self.ttl:
+            self._remove(path)
+            self._count('misses')
+            return None
+        # mtime doubles as the last-access time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count('hits')
+        return entry['info']
+
+    def set(self, key, info):
+        """Store a sanitized copy of a single-video info dict"""
+        if info is None or info.get('_type', 'video') != 'video':
+            return
+        yt_dlp = load_ytdlp()
+        entry = {'key': key, 'stored_at': time.time(),
+                 'info': yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)}
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats['stores'] += 1
+            self._size += len(data) - old_size
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is under 90% of max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        with self._lock:
+            # Resync with the directory, which other processes may share
+            self._size = total
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            self._count('evictions')
+
+    def extract(self, ydl, url):
+        """ydl.extract_info(url, download=False), served from the cache when possible.
+
+        The result can be handed to ydl.process_ie_result(info, download=True)
+        to download without extracting again.
+        """
+        key = canonical_key(url)
+        info = self.get(key)
+        if info is not None:
+            return info
+        info = ydl.extract_info(url, download=False)
+        self.set(key, info)
+        return info
+
+
+class YoutubeDLPool:
+    """Reusable YoutubeDL instances, one per thread and option set.
+
+    A YoutubeDL is not thread-safe, but one instance can run many
+    extractions in a row, keeping its extractors, cookie jar and HTTP
+    connections warm. Options holding callables (progress hooks) are
+    per-call and should not be pooled.
+    """
+
+    def __init__(self, max_per_thread=4):
+        self.max_per_thread = max_per_thread
+        self._local = threading.local()
+
+    def get(self, opts):
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = OrderedDict()
+        key = json.dumps(opts, sort_keys=True, default=str)
+        ydl = instances.get(key)
+        if ydl is None:
+            ydl = instances[key] = load_ytdlp().YoutubeDL(opts)
+            while len(instances) > self.max_per_thread:
+                _, old = instances.popitem(last=False)
+                old.close()
+        instances.move_to_end(key)
+        return ydl
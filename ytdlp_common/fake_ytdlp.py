@@ -0,0 +1,177 @@
+"""Offline stand-in for `yt_dlp`, used when YTDLP_BACKEND=fake.
+
+Covers the parts of the API the tools in this repository use: extract_info
+(videos and playlists), process_ie_result with download archives and
+progress hooks, urlopen for subtitle tracks and sanitize_info. Results are
+deterministic per URL. Each video has an SRT and a VTT track of
+FAKE_YTDLP_CUES cues and downloads as FAKE_YTDLP_BYTES bytes; playlists
+have FAKE_YTDLP_PLAYLIST entries and each extraction sleeps for
+FAKE_YTDLP_LATENCY seconds to mimic a network round trip.
+"""
+import io
+import os
+import time
+import zlib
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from ytdlp_common.ids import youtube_id
+
+CUES = int(os.environ.get("FAKE_YTDLP_CUES", 500))
+VIDEO_BYTES = int(os.environ.get("FAKE_YTDLP_BYTES", 1000000))
+PLAYLIST_SIZE = int(os.environ.get("FAKE_YTDLP_PLAYLIST", 10))
+LATENCY = float(os.environ.get("FAKE_YTDLP_LATENCY", 0.0))
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+utils = SimpleNamespace(DownloadError=DownloadError, DownloadCancelled=DownloadCancelled)
+
+
+def _timestamp(ms, sep):
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{sep}{ms:03d}"
+
+
+def make_track(video_id, ext, cues=None):
+    """Synthetic SRT or VTT track for a video"""
+    cues = CUES if cues is None else cues
+    sep = ',' if ext == 'srt' else '.'
+    blocks = ["WEBVTT\n"] if ext == 'vtt' else []
+    for i in range(cues):
+        start = i * 2500
+        header = f"{i + 1}\n" if ext == 'srt' else ""
+        blocks.append(f"{header}{_timestamp(start, sep)} --> {_timestamp(start + 2000, sep)}\n"
+                      f"Line {i} of video {video_id} with a few more words\n")
+    return '\n'.join(blocks).encode('utf-8')
+
+
+def _video_id(url):
+    return youtube_id(url) or f"{zlib.crc32(url.encode('utf-8')) % 10 ** 11:011d}"
+
+
+def _video_info(url):
+    video_id = _video_id(url)
+    return {
+        '_type': 'video',
+        'id': video_id,
+        'title': f"Fake video {video_id}",
+        'extractor_key': 'Youtube',
+        'webpage_url': f"https://www.youtube.com/watch?v={video_id}",
+        'duration': CUES * 2.5,
+        'ext': 'mp4',
+        'format': '18 - 640x360 (fake)',
+        'subtitles': {'en': [
+            {'ext': 'vtt', 'url': f"fake://subtitles/{video_id}.vtt"},
+            {'ext': 'srt', 'url': f"fake://subtitles/{video_id}.srt"},
+        ]},
+        'automatic_captions': {},
+    }
+
+
+def _is_playlist(url):
+    parsed = urlparse(url)
+    return 'list' in parse_qs(parsed.query) or parsed.path.rstrip('/').endswith('/playlist')
+
+
+class YoutubeDL:
+    def __init__(self, params=None, auto_init=True):
+        self.params = dict(params or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def get_info_extractor(self, ie_key):
+        return SimpleNamespace(ie_key=ie_key)
+
+    @staticmethod
+    def sanitize_info(info, remove_private_keys=False):
+        if not remove_private_keys:
+            return dict(info)
+        return {key: value for key, value in info.items()
+                if key == '_type' or not key.startswith('_') and key != 'requested_downloads'}
+
+    def urlopen(self, url):
+        name = url.rsplit('/', 1)[-1]
+        video_id, _, ext = name.rpartition('.')
+        return io.BytesIO(make_track(video_id, ext))
+
+    def extract_info(self, url, download=True, **kwargs):
+        if LATENCY:
+            time.sleep(LATENCY)
+        if _is_playlist(url):
+            count = min(PLAYLIST_SIZE, self.params.get('playlistend') or PLAYLIST_SIZE)
+            seed = zlib.crc32(url.encode('utf-8'))
+            entries = []
+            for i in range(count):
+                video_id = f"{(seed + i) % 10 ** 11:011d}"
+                entries.append({'_type': 'url', 'ie_key': 'Youtube', 'id': video_id,
+                                'title': f"Fake video {video_id}",
+                                'url': f"https://www.youtube.com/watch?v={video_id}"})
+            return {'_type': 'playlist', 'id': str(seed), 'title': f"Fake playlist {seed}",
+                    'entries': entries}
+        info = _video_info(url)
+        if self._archived(info):
+            return None
+        return self.process_ie_result(info, download=download)
+
+    def _archive_path(self):
+        return self.params.get('download_archive')
+
+    def _archived(self, info):
+        path = self._archive_path()
+        if not path or not os.path.exists(path):
+            return False
+        with open(path, encoding='utf-8') as f:
+            return f"youtube {info['id']}\n" in f
+
+    def process_ie_result(self, info, download=True):
+        if not download:
+            return info
+        if self._archived(info):
+            return dict(info)
+        outtmpl = self.params.get('outtmpl', '%(title)s.%(ext)s')
+        if isinstance(outtmpl, dict):
+            outtmpl = outtmpl.get('default', '%(title)s.%(ext)s')
+        filename = outtmpl % {'title': info['title'], 'ext': info['ext'], 'id': info['id']}
+        tmpfilename = filename + '.part'
+        hooks = self.params.get('progress_hooks') or []
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        started = time.monotonic()
+        chunk = b'\0' * CHUNK_SIZE
+        written = 0
+        with open(tmpfilename, 'wb') as f:
+            while written < VIDEO_BYTES:
+                size = min(CHUNK_SIZE, VIDEO_BYTES - written)
+                f.write(chunk[:size])
+                written += size
+                elapsed = time.monotonic() - started
+                for hook in hooks:
+                    hook({'status': 'downloading', 'downloaded_bytes': written, 'total_bytes': VIDEO_BYTES,
+                          'tmpfilename': tmpfilename, 'filename': filename,
+                          'speed': written / elapsed if elapsed else None, 'eta': 0})
+        os.replace(tmpfilename, filename)
+        for hook in hooks:
+            hook({'status': 'finished', 'filename': filename, 'total_bytes': VIDEO_BYTES})
+        archive = self._archive_path()
+        if archive:
+            with open(archive, 'a', encoding='utf-8') as f:
+                f.write(f"youtube {info['id']}\n")
+        return dict(info, filepath=filename, requested_downloads=[{'filepath': filename}])
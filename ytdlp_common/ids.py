@@ -0,0 +1,34 @@
+import re
+from urllib.parse import parse_qs, urlparse
+
+from ytdlp_common.throttle import host_key
+
+YOUTUBE_ID_RE = re.compile(r'^[0-9A-Za-z_-]{11}$')
+
+
+def youtube_id(url):
+    """Video ID of a YouTube watch/short/embed/youtu.be URL, or None.
+
+    Works without network access, so it can be used to look a video up in a
+    local index before yt-dlp is called. Playlist URLs return None, including
+    watch?v=X&list=Y, which yt-dlp expands to the whole playlist.
+    """
+    if '//' not in url:
+        url = 'https://' + url
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if 'list' in query:
+        return None
+    candidate = None
+    if (parsed.hostname or '').lower() == 'youtu.be':
+        candidate = parsed.path.strip('/').split('/')[0]
+    elif host_key(url) == 'youtube.com':
+        if parsed.path == '/watch':
+            candidate = query.get('v', [None])[0]
+        else:
+            parts = parsed.path.strip('/').split('/')
+            if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                candidate = parts[1]
+    if candidate and YOUTUBE_ID_RE.match(candidate):
+        return candidate
+    return None
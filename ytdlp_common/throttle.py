@@ -0,0 +1,214 @@
+import glob
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+HTTP_STATUS_RE = re.compile(r'HTTP Error (\d{3})')
+# Hosts that share YouTube's rate limit
+HOST_ALIASES = {'youtu.be': 'youtube.com', 'youtube-nocookie.com': 'youtube.com'}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` banked"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill_locked()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+
+class CookiePool:
+    """Round-robin over cookies.txt files, rotated when a host starts returning 429"""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._index = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dir(cls, directory, pattern='cookies*.txt'):
+        return cls(sorted(glob.glob(os.path.join(directory, pattern))))
+
+    def current(self):
+        with self._lock:
+            return self.paths[self._index] if self.paths else None
+
+    def rotate(self):
+        with self._lock:
+            if self.paths:
+                self._index = (self._index + 1) % len(self.paths)
+                return self.paths[self._index]
+            return None
+
+
+def http_status(exc):
+    """Best-effort HTTP status behind a yt-dlp or urllib exception"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        for attr in ('status', 'code'):
+            status = getattr(exc, attr, None)
+            if isinstance(status, int) and 100 <= status < 600:
+                return status
+        match = HTTP_STATUS_RE.search(str(exc))
+        if match:
+            return int(match.group(1))
+        # DownloadError keeps the original exception in exc_info
+        exc_info = getattr(exc, 'exc_info', None)
+        exc = exc_info[1] if exc_info else (exc.__cause__ or exc.__context__)
+    return None
+
+
+def host_key(url):
+    host = (urlparse(url).hostname or '').lower()
+    for prefix in ('www.', 'm.', 'music.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return HOST_ALIASES.get(host, host)
+
+
+class Throttle:
+    """Shared limiter and retry scheduler for yt-dlp calls.
+
+    Every call takes a token from a global bucket, holds one of
+    `max_per_host` slots for its host, and is retried with exponential
+    backoff plus jitter when it fails with 429 or 5xx. A 429 also rotates
+    to the next cookies file in the pool.
+    """
+
+    def __init__(self, rate=0.5, burst=2, max_per_host=2, max_retries=4,
+                 base_delay=2.0, max_delay=120.0, cookie_pool=None, sleep=time.sleep):
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cookie_pool = cookie_pool or CookiePool([])
+        self._sleep = sleep
+        self._hosts = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            'calls': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'retries': 0,
+            'http_429': 0,
+            'http_5xx': 0,
+            'cookie_rotations': 0,
+            'limiter_wait_seconds': 0.0,
+            'backoff_seconds': 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, cookies_dir=None):
+        """Build a Throttle from YTDLP_* environment variables"""
+        env = os.environ.get
+        return cls(
+            rate=float(env('YTDLP_RATE', 0.5)),
+            burst=int(env('YTDLP_BURST', 2)),
+            max_per_host=int(env('YTDLP_MAX_PER_HOST', 2)),
+            max_retries=int(env('YTDLP_MAX_RETRIES', 4)),
+            base_delay=float(env('YTDLP_BACKOFF', 2.0)),
+            max_delay=float(env('YTDLP_MAX_BACKOFF', 120.0)),
+            cookie_pool=CookiePool.from_dir(env('YTDLP_COOKIES_DIR', cookies_dir or '.')),
+        )
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _host_slot(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+                self._in_flight[host] = 0
+            return self._hosts[host]
+
+    def backoff(self, attempt):
+        """Exponential delay for retry `attempt` (0-based) with equal jitter"""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def call(self, url, fn):
+        """Run fn(cookiefile) for `url` under the limiter, retrying 429/5xx"""
+        host = host_key(url)
+        slot = self._host_slot(host)
+        self._count('calls')
+        attempt = 0
+        while True:
+            self._count('limiter_wait_seconds', self.bucket.acquire())
+            with slot:
+                with self._lock:
+                    self._in_flight[host] += 1
+                try:
+                    result = fn(self.cookie_pool.current())
+                except Exception as e:
+                    status = http_status(e)
+                    retryable = status == 429 or (status is not None and status >= 500)
+                    if status == 429:
+                        self._count('http_429')
+                    elif retryable:
+                        self._count('http_5xx')
+                    if not retryable or attempt >= self.max_retries:
+                        self._count('failed')
+                        raise
+                else:
+                    self._count('succeeded')
+                    return result
+                finally:
+                    with self._lock:
+                        self._in_flight[host] -= 1
+
+            if status == 429 and len(self.cookie_pool.paths) > 1:
+                self.cookie_pool.rotate()
+                self._count('cookie_rotations')
+            delay = self.backoff(attempt)
+            self._count('retries')
+            self._count('backoff_seconds', delay)
+            self._sleep(delay)
+            attempt += 1
+
+    def metrics(self):
+        """Snapshot of limiter state and retry counters"""
+        with self._lock:
+            data = dict(self.counters)
+            data['in_flight'] = dict(self._in_flight)
+        data['tokens_available'] = round(self.bucket.tokens, 3)
+        data['rate_per_second'] = self.bucket.rate
+        data['burst'] = self.bucket.capacity
+        data['max_per_host'] = self.max_per_host
+        data['cookie_file'] = self.cookie_pool.current()
+        data['cookie_files'] = len(self.cookie_pool.paths)
+        return data